@@ -0,0 +1,87 @@
+import asyncio
+import functools
+
+
+class AsyncHungerGames:
+    """
+    An asyncio facade over HungerGames that keeps simulation work off the event loop.
+
+    Calls for the same channel run one at a time in the order they were made, so two steps in a channel can never
+    interleave. Calls that simulate or render run in executor (the loop's default thread pool if None). The rest are
+    cheap, so they run on the loop as soon as the channel is free.
+    """
+
+    def __init__(self, hg, executor=None):
+        self.hg = hg
+        self.executor = executor
+        self.locks = {}
+        self.waiting = {}
+
+    async def flush(self):
+        """
+        Encodes every unsaved game in executor while holding its channel, then flushes the store.
+
+        Games with a call in progress are left for the next flush rather than waited for.
+        """
+        await asyncio.gather(*(self.__call(channel_id, True, self.hg.store.encode)
+                               for channel_id in self.hg.store.unsaved() if channel_id not in self.locks))
+        self.hg.store.flush()
+
+    async def sweep(self):
+        """Evicts abandoned games, leaving those with a call in progress, and spills them from executor."""
+        evicted = self.hg.sweep(busy=self.locks.keys())
+        await asyncio.gather(*(self.__call(channel_id, True, self.hg.active_games.write_spill)
+                               for channel_id in list(self.hg.active_games.spilling)))
+        return evicted
+
+    async def new_game(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, False, self.hg.new_game, *args, **kwargs)
+
+    async def add_player(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, False, self.hg.add_player, *args, **kwargs)
+
+    async def autoplay(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, False, self.hg.autoplay, *args, **kwargs)
+
+    async def remove_player(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, False, self.hg.remove_player, *args, **kwargs)
+
+    async def end_game(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, False, self.hg.end_game, *args, **kwargs)
+
+    async def pad_players(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, True, self.hg.pad_players, *args, **kwargs)
+
+    async def status(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, True, self.hg.status, *args, **kwargs)
+
+    async def odds(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, True, self.hg.odds, *args, **kwargs)
+
+    async def start_game(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, True, self.hg.start_game, *args, **kwargs)
+
+    async def step(self, channel_id, *args, **kwargs):
+        return await self.__call(channel_id, True, self.hg.step, *args, **kwargs)
+
+    async def __call(self, channel_id, offload, func, *args, **kwargs):
+        # asyncio.Lock wakes its waiters first come, first served, which is what keeps a channel's calls in order
+        lock = self.locks.get(channel_id)
+        if lock is None:
+            lock = self.locks[channel_id] = asyncio.Lock()
+        self.waiting[channel_id] = self.waiting.get(channel_id, 0) + 1
+        try:
+            async with lock:
+                if not offload and self.hg.active_games.has_spill(channel_id):
+                    # Looking the game up would restore it right here on the loop
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.executor, self.hg.active_games.restore, channel_id)
+                if not offload:
+                    return func(channel_id, *args, **kwargs)
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor, functools.partial(func, channel_id, *args, **kwargs))
+        finally:
+            self.waiting[channel_id] -= 1
+            if self.waiting[channel_id] == 0:
+                del self.waiting[channel_id]
+                del self.locks[channel_id]
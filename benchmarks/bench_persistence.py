@@ -0,0 +1,52 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hungergames import HungerGames
+from journal import JournalStore
+from store import GameStore, SQLiteStore
+
+
+def bench(store, channels=200, tributes=24):
+    """
+    Steps channels concurrent games to the end, flushing the store once per tick (one step of every game).
+
+    Returns the mean step latency and the mean flush latency on the calling thread, in microseconds.
+    """
+    hg = HungerGames(store)
+    for c in range(channels):
+        hg.new_game(c, 0, "owner", "Benchmark", seed=c)
+        hg.pad_players(c, [str(i) for i in range(tributes)])
+        hg.start_game(c, 0, "h$")
+    hg.flush()
+
+    steps = []
+    flushes = []
+    while hg.active_games:
+        for c in list(hg.active_games):
+            start = time.perf_counter()
+            hg.step(c, 0)
+            steps.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        hg.flush()
+        flushes.append(time.perf_counter() - start)
+    store.close()
+    return 1e6 * sum(steps) / len(steps), 1e6 * sum(flushes) / len(flushes)
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        off = bench(GameStore())
+        on = bench(SQLiteStore(os.path.join(directory, "games.db")))
+        journaled = bench(JournalStore(os.path.join(directory, "journal")))
+    finally:
+        shutil.rmtree(directory)
+    print("{0:<16} {1:>12} {2:>14}".format("persistence", "us/step", "us/flush"))
+    print("{0:<16} {1:>12.1f} {2:>14.1f}".format("off", *off))
+    print("{0:<16} {1:>12.1f} {2:>14.1f}".format("sqlite", *on))
+    print("{0:<16} {1:>12.1f} {2:>14.1f}".format("journal", *journaled))
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eventtable import CompiledEvent
+from game import Game
+from player import Player
+
+
+def synthetic_event(size, rng):
+    """An event with size nonfatal and size fatal actions of random weight and tribute count."""
+    def actions(fatal):
+        for _ in range(size):
+            tributes = rng.randint(1, 4)
+            action = {'msg': "{0}", 'tributes': tributes, 'weight': rng.uniform(0.1, 10)}
+            if fatal:
+                action['killer'] = None
+                action['killed'] = [0]
+            yield action
+    nonfatal = [{'msg': "{0}", 'tributes': 1}] + list(actions(False))
+    return CompiledEvent({'title': "Day {0}", 'description': None, 'color': 0,
+                          'nonfatal': nonfatal, 'fatal': list(actions(True))}, [])
+
+
+def bench_draws(event, draws=200000):
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(draws):
+        event.pick_nonfatal(4, rng)
+    return 1e9 * (time.perf_counter() - start) / draws
+
+
+def bench_cumulative(event, draws=200000):
+    """The per-pick cumulative weight scan that alias tables replace."""
+    table = event.nonfatal[4]
+    weights = [a.weight for a in table]
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(draws):
+        rng.choices(table.actions, weights)
+    return 1e9 * (time.perf_counter() - start) / draws
+
+
+def bench_round(event, tributes=24, rounds=2000):
+    """Times the first round of fresh games whose bloodbath is event."""
+    elapsed = 0
+    for seed in range(rounds):
+        g = Game(None, None, None, seed=seed)
+        for x in range(tributes):
+            g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        g.start()
+        g.events = dict(g.events, bloodbath=event)
+        start = time.perf_counter()
+        g.step()
+        elapsed += time.perf_counter() - start
+    return 1e6 * elapsed / rounds
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    print("{0:>8} {1:>14} {2:>17} {3:>12}".format("actions", "alias ns/draw", "cumsum ns/draw", "us/round"))
+    for size in (10, 100, 1000, 10000):
+        event = synthetic_event(size, rng)
+        print("{0:>8} {1:>14.1f} {2:>17.1f} {3:>12.1f}".format(size, bench_draws(event), bench_cumulative(event),
+                                                               bench_round(event)))
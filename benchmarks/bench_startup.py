@@ -0,0 +1,28 @@
+import glob
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eventpacks import CACHE_DIR
+
+MEASURE = "import time; start = time.perf_counter(); import game; print(time.perf_counter() - start)"
+
+
+def import_time(clear_cache):
+    if clear_cache:
+        for path in glob.glob(os.path.join(CACHE_DIR, "events-*.pickle")):
+            os.remove(path)
+    out = subprocess.run([sys.executable, "-c", MEASURE], cwd=ROOT, check=True, stdout=subprocess.PIPE)
+    return 1000 * float(out.stdout)
+
+
+if __name__ == "__main__":
+    runs = 10
+    cold = statistics.median(import_time(True) for _ in range(runs))
+    warm = statistics.median(import_time(False) for _ in range(runs))
+    print("import game, no compiled cache   {0:>7.2f} ms".format(cold))
+    print("import game, cached event tables {0:>7.2f} ms".format(warm))
@@ -0,0 +1,29 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hungergames import HungerGames, TOURNAMENT_MAX_PLAYERS
+
+
+def bench(tributes, games=5):
+    """Returns the mean and worst HungerGames.step latency in milliseconds over whole games of tributes tributes."""
+    hg = HungerGames()
+    timings = []
+    for seed in range(games):
+        hg.new_game(0, 0, "owner", "Benchmark", seed=seed, max_players=TOURNAMENT_MAX_PLAYERS)
+        hg.pad_players(0, [str(i) for i in range(tributes)])
+        hg.start_game(0, 0, "h$")
+        while 0 in hg.active_games:
+            start = time.perf_counter()
+            hg.step(0, 0)
+            timings.append(time.perf_counter() - start)
+    return 1000 * sum(timings) / len(timings), 1000 * max(timings)
+
+
+if __name__ == "__main__":
+    print("{0:>8} {1:>10} {2:>10}".format("tributes", "mean ms", "max ms"))
+    for n in (24, 100, 500, 1000, 2500, 5000):
+        mean, worst = bench(n)
+        print("{0:>8} {1:>10.3f} {2:>10.3f}".format(n, mean, worst))
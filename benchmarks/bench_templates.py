@@ -0,0 +1,26 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eventpacks import library
+from player import Player
+
+
+def bench(render, actions, tributes, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for a in actions:
+            render(a, tributes)
+    return 1e9 * (time.perf_counter() - start) / (repeat * len(actions))
+
+
+if __name__ == "__main__":
+    actions = library.tables['actions']
+    tributes = [Player("Tribute {0}".format(i), i + 1, i % 2 == 0) for i in range(6)]
+    formatted = bench(lambda a, t: a.msg.format(*t), actions, tributes)
+    compiled = bench(lambda a, t: a.template.render(t), actions, tributes)
+    print("{0} templates".format(len(actions)))
+    print("str.format      {0:>8.1f} ns/render".format(formatted))
+    print("Template.render {0:>8.1f} ns/render".format(compiled))
@@ -0,0 +1,24 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import odds
+import vecsim
+
+
+def games_per_second(simulate, roster, trials):
+    start = time.perf_counter()
+    simulate(roster, trials)
+    return trials / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    print("{0:<10} {1:>14} {2:>14} {3:>9}".format("tributes", "game/s (Game)", "game/s (NumPy)", "speedup"))
+    for tributes, trials in ((24, 2000), (200, 200), (1000, 40)):
+        roster = [(str(x), x // 2 + 1, x % 2 == 0) for x in range(tributes)]
+        reference = games_per_second(lambda r, t: odds.simulate_odds(r, t, workers=1, seed=0), roster, trials)
+        vectorized = games_per_second(lambda r, t: vecsim.simulate_odds(r, t, seed=0), roster, trials * 10)
+        print("{0:<10} {1:>14.1f} {2:>14.1f} {3:>8.1f}x".format(tributes, reference, vectorized,
+                                                                vectorized / reference))
@@ -2,7 +2,20 @@ from discord.ext import commands
 from context import HungryContext
 
 
-class HungryBot(commands.Bot):
+class HungryBot(commands.AutoShardedBot):
+    # A SendQueue every context sends through, once set
+    outbox = None
+
     async def on_message(self, message):
         ctx = await self.get_context(message, cls=HungryContext)
         await self.invoke(ctx)
+
+
+class DiscordTransport:
+    """Sends a SendQueue's messages with the bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def send(self, channel_id, content, embed):
+        return await self.bot.get_channel(channel_id).send(content=content, embed=embed)
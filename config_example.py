@@ -1,3 +1,12 @@
 config = {
-    'token': "your_token_here"
+    'token': "your_token_here",
+    'watch_packs': False,
+    'database': "hungrybot.db",
+    'journal': None,
+    'shard_count': None,
+    'shard_ids': None,
+    'game_ttl': 7 * 24 * 60 * 60,
+    'max_games': None,
+    'spill_dir': None,
+    'metrics_port': None
 }
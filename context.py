@@ -2,5 +2,10 @@ from discord.ext import commands
 
 
 class HungryContext(commands.Context):
+    async def send(self, content=None, *, embed=None, **kwargs):
+        if self.bot.outbox is None or kwargs:
+            return await super().send(content, embed=embed, **kwargs)
+        return await self.bot.outbox.send(self.channel.id, content, embed)
+
     def reply(self, message):
         return self.send("{0} | {1}".format(self.author.mention, message))
@@ -22,3 +22,5 @@ class ErrorCode(Enum):
     NOT_ENOUGH_PLAYERS = 0x8
     GAME_NOT_STARTED = 0x9
     PLAYER_DOES_NOT_EXIST = 0xA
+    INVALID_MAX_PLAYERS = 0xB
+    INVALID_INTERVAL = 0xC
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from eventtable import compile_events
+from validator import validate_pack, EventPackError, BASE_EVENTS
+
+PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'packs')
+DEFAULT_PACK = 'default.json'
+CACHE_DIR = os.path.join(PACK_DIR, '__pycache__')
+
+# Bump whenever the compiled classes change so stale caches are never unpickled
+CACHE_VERSION = 3
+
+
+def pack_paths(directory=PACK_DIR):
+    """The default pack followed by every other .json pack in directory, in name order."""
+    names = sorted(n for n in os.listdir(directory) if n.endswith('.json') and n != DEFAULT_PACK)
+    return [os.path.join(directory, n) for n in [DEFAULT_PACK] + names]
+
+
+def read_pack(path):
+    with open(path, 'rb') as f:
+        return parse_pack(f.read())
+
+
+def parse_pack(data):
+    # json is only imported on a cache miss, which keeps it out of the normal startup path
+    import json
+    return json.loads(data.decode('utf-8'))
+
+
+def merge_packs(packs):
+    """
+    Merges packs into a single events source.
+
+    The first pack must define every base event. Later packs may add 'nonfatal' and 'fatal' actions to any base event
+    and append whole new events to 'arena'.
+    """
+    base = packs[0]
+    source = {key: dict(base[key], nonfatal=list(base[key]['nonfatal']), fatal=list(base[key]['fatal']))
+              for key in BASE_EVENTS}
+    source['arena'] = list(base.get('arena', []))
+    for pack in packs[1:]:
+        for key in BASE_EVENTS:
+            if key in pack:
+                source[key]['nonfatal'] += pack[key].get('nonfatal', [])
+                source[key]['fatal'] += pack[key].get('fatal', [])
+        source['arena'] += pack.get('arena', [])
+    return source
+
+
+def load_packs(paths=None, cache_dir=CACHE_DIR):
+    """
+    Loads and compiles the given event packs, defaulting to every pack in packs/.
+
+    Every pack is validated before compiling, raising EventPackError, so games never need to check actions
+    themselves. Compiled tables are cached in cache_dir under a hash of the pack files, so later loads of unchanged
+    packs skip parsing, validating and compiling entirely. The hash is kept as the tables' 'digest'.
+    """
+    if paths is None:
+        paths = pack_paths()
+
+    contents = []
+    digest = hashlib.sha256("v{0}".format(CACHE_VERSION).encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        contents.append(data)
+        digest.update(os.path.basename(path).encode())
+        digest.update(hashlib.sha256(data).digest())
+    cache_path = os.path.join(cache_dir, "events-{0}.pickle".format(digest.hexdigest()[:32]))
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # A missing or unreadable cache only costs a recompile
+        pass
+
+    packs = []
+    for i, (path, data) in enumerate(zip(paths, contents)):
+        try:
+            pack = parse_pack(data)
+        except ValueError as e:
+            raise EventPackError(path, [str(e)])
+        errors = validate_pack(pack, base=i == 0)
+        if errors:
+            raise EventPackError(path, errors)
+        packs.append(pack)
+
+    compiled = compile_events(merge_packs(packs))
+    compiled['digest'] = digest.hexdigest()
+    __write_cache(cache_path, compiled)
+    return compiled
+
+
+def __write_cache(cache_path, compiled):
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith("events-") and name.endswith(".pickle"):
+                os.remove(os.path.join(cache_dir, name))
+        temp_path = "{0}.{1}.tmp".format(cache_path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            pickle.dump(compiled, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # A read-only checkout just compiles on every start
+        pass
+
+
+class EventLibrary:
+    """
+    Holds the compiled tables of the packs in a directory and swaps in new ones when the packs change.
+
+    tables is replaced by a single assignment, so readers always see either the old or the new tables in full. Games
+    keep a reference to the tables they started with and are unaffected by later reloads. Every set of tables loaded
+    is also kept in known by digest, so a game pickled in this process finds its own tables again when unpickled.
+    """
+
+    def __init__(self, directory=PACK_DIR, cache_dir=CACHE_DIR):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.version = 1
+        self.reload_lock = threading.Lock()
+        self.signature = self.__signature()
+        self.tables = load_packs(pack_paths(directory), cache_dir)
+        self.known = {self.tables['digest']: self.tables}
+
+    def changed(self):
+        return self.__signature() != self.signature
+
+    def reload(self):
+        """
+        Recompiles the packs and swaps the new tables in. Returns the new version.
+
+        Raises EventPackError and keeps the current tables if a pack is invalid.
+        """
+        with self.reload_lock:
+            signature = self.__signature()
+            tables = load_packs(pack_paths(self.directory), self.cache_dir)
+            self.signature = signature
+            self.tables = tables
+            self.known[tables['digest']] = tables
+            self.version += 1
+            return self.version
+
+    def watch(self, interval=5.0, on_error=None):
+        """Starts a daemon thread that reloads whenever a pack file changes. Set the returned event to stop it."""
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(interval):
+                if not self.changed():
+                    continue
+                try:
+                    self.reload()
+                except (OSError, EventPackError) as e:
+                    # Don't retry until the packs change again
+                    self.signature = self.__signature()
+                    if on_error is not None:
+                        on_error(e)
+
+        threading.Thread(target=poll, name="pack-watcher", daemon=True).start()
+        return stop
+
+    def __signature(self):
+        signature = []
+        for path in pack_paths(self.directory):
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        return signature
+
+
+library = EventLibrary()
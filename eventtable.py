@@ -0,0 +1,124 @@
+import random
+
+from templates import Template
+
+
+class CompiledAction:
+    __slots__ = ('id', 'msg', 'template', 'tributes', 'killer', 'killed', 'victims', 'weight')
+
+    def __init__(self, action_id, action):
+        self.id = action_id
+        self.msg = action['msg']
+        self.template = Template(action['msg'])
+        self.tributes = action['tributes']
+        self.killer = tuple(action.get('killer') or ())
+        self.killed = tuple(action.get('killed') or ())
+        self.victims = len(self.killed)
+        self.weight = action.get('weight', 1)
+
+
+class AliasTable:
+    """
+    Draws actions in proportion to their weights in O(1) using Vose's alias method.
+
+    Slot i is picked uniformly, then keeps its own action with probability prob[i] or yields alias[i] otherwise.
+    """
+
+    __slots__ = ('actions', 'prob', 'alias')
+
+    def __init__(self, actions):
+        self.actions = tuple(actions)
+        n = len(self.actions)
+        total = sum(a.weight for a in self.actions)
+        scaled = [a.weight * n / total for a in self.actions]
+        prob = [1.0] * n
+        alias = list(self.actions)
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = self.actions[l]
+            scaled[l] += scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        self.prob = tuple(prob)
+        self.alias = tuple(alias)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    def draw(self, rng=random):
+        u = rng.random() * len(self.actions)
+        i = int(u)
+        if u - i < self.prob[i]:
+            return self.actions[i]
+        return self.alias[i]
+
+
+class CompiledEvent:
+    """An event whose actions are bucketed by how many tributes they need.
+
+    nonfatal[t] holds every nonfatal action needing at most t tributes, and fatal[t][v]
+    every fatal action needing at most t tributes and killing at most v of them, so a
+    draw only ever sees actions that can be carried out. Each bucket is an AliasTable
+    over the actions' weights.
+    """
+
+    __slots__ = ('title', 'description', 'color', 'max_tributes', 'max_victims', 'nonfatal', 'fatal')
+
+    def __init__(self, event, actions):
+        self.title = event['title']
+        self.description = event['description']
+        self.color = parse_color(event['color'])
+
+        nonfatal = [self.__add(actions, a) for a in event['nonfatal']]
+        fatal = [self.__add(actions, a) for a in event['fatal']]
+
+        self.max_tributes = max(a.tributes for a in nonfatal + fatal)
+        self.max_victims = max([a.victims for a in fatal], default=0)
+        self.nonfatal = tuple(AliasTable(a for a in nonfatal if a.tributes <= t) for t in range(self.max_tributes + 1))
+        self.fatal = tuple(tuple(AliasTable(a for a in fatal if a.tributes <= t and a.victims <= v)
+                                 for v in range(self.max_victims + 1))
+                           for t in range(self.max_tributes + 1))
+
+        if len(self.nonfatal[1]) == 0:
+            raise ValueError("Event '{0}' has no nonfatal action for a single tribute".format(self.title))
+
+    def pick_nonfatal(self, tributes, rng=random):
+        return self.nonfatal[min(tributes, self.max_tributes)].draw(rng)
+
+    def pick_fatal(self, tributes, victims, rng=random):
+        bucket = self.fatal[min(tributes, self.max_tributes)][min(victims, self.max_victims)]
+        if len(bucket) == 0:
+            return None
+        return bucket.draw(rng)
+
+    @staticmethod
+    def __add(actions, action):
+        compiled = CompiledAction(len(actions), action)
+        actions.append(compiled)
+        return compiled
+
+
+def compile_events(source):
+    actions = []
+    compiled = {key: CompiledEvent(source[key], actions) for key in ('bloodbath', 'day', 'night', 'feast')}
+    compiled['arena'] = [CompiledEvent(e, actions) for e in source['arena']]
+    compiled['actions'] = actions
+    return compiled
+
+
+def parse_color(color):
+    """Accepts either an int or a '#rrggbb' string, as written in JSON packs."""
+    if type(color) is str:
+        return int(color.lstrip('#'), 16)
+    return color
@@ -1,22 +1,60 @@
 import random
 import math
+import bisect
+import time
 from enums import RoundType
-from events import events
+import eventpacks
+import metrics
+from pool import TributePool
+from player import Player
+
+
+class StaleGameError(ValueError):
+    """A started game was unpickled without the event tables it was playing with, so it can't be continued."""
+
+    def __init__(self, digest):
+        super().__init__("Game was started with event tables {0}, which are no longer loaded".format(digest))
+        self.digest = digest
 
 
 class Game:
-    def __init__(self, owner_name, owner_id, title: str):
+    def __init__(self, owner_name, owner_id, title: str, seed=None, max_players=24, guild_id=None):
         self.owner_name = owner_name
         self.owner_id = owner_id
+        self.guild_id = guild_id
         self.title = title
+        self.max_players = max_players
         self.has_started = False
 
+        # Wall clock time the game was last looked up, kept by GameRegistry so idle games expire across restarts
+        self.last_used = time.time()
+
+        # The compiled event tables this game plays with. Refreshed at start, then kept through pack reloads.
+        self.events = eventpacks.library.tables
+
+        # The whole simulation draws from this, so a seed and roster replay a game exactly
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+
+        # Bumped whenever anything shown in the roster changes, so renderings can be cached against it
+        self.version = 0
+        self.render_cache = {}
+
         # Player data
         self.players = {}
-        self.players_available_to_act = set()
+        self.sorted_players = []
+        self.players_alive = TributePool()
+        self.players_available_to_act = TributePool()
         self.players_dead_today = []
         self.total_players_alive = 0
 
+        # Tributes in the order their indices are recorded in, fixed at start
+        self.roster = []
+        self.roster_index = {}
+
+        # Every round played as (day, round type, arena event index, records), rendered only on request
+        self.history = []
+
         # Round counting
         self.day = 1
         self.days_since_last_event = 0
@@ -28,39 +66,188 @@ class Game:
         self.fallen_passed = False
         self.night_passed = False
 
+    def __getstate__(self):
+        # The event tables are shared by every game, so they are never stored with one
+        state = self.__dict__.copy()
+        state['events_digest'] = state.pop('events').get('digest')
+        state['render_cache'] = {}
+        return state
+
+    def __setstate__(self, state):
+        # A started game's history indexes into its own tables, so it is only playable with exactly those
+        digest = state.pop('events_digest', None)
+        events = eventpacks.library.known.get(digest)
+        if events is None:
+            if state['has_started']:
+                raise StaleGameError(digest)
+            events = eventpacks.library.tables
+        state.setdefault('last_used', time.time())
+        self.__dict__.update(state)
+        self.events = events
+
     @property
     def players_sorted(self):
-        l = list(self.players.values())
-        l.sort()
-        return l
+        return list(self.sorted_players)
+
+    @classmethod
+    def replay(cls, record):
+        """
+        Recreates a started game from record(). Stepping it plays out exactly like the original.
+
+        Raises StaleGameError if the event tables the game was played with are no longer loaded.
+        """
+        events = eventpacks.library.known.get(record.get('digest'))
+        if events is None:
+            raise StaleGameError(record.get('digest'))
+        g = cls(record['owner_name'], record['owner_id'], record['title'], record['seed'])
+        for name, district, is_male in record['roster']:
+            g.add_player(Player(name, district, is_male))
+        g.start(events)
+        return g
+
+    def record(self):
+        return {
+            'seed': self.seed,
+            'digest': self.events.get('digest'),
+            'owner_name': self.owner_name,
+            'owner_id': self.owner_id,
+            'title': self.title,
+            'roster': [(p.name, p.district, p.is_male) for p in self.roster]
+        }
 
     def add_player(self, new_player):
         if new_player.name in self.players:
             return False
         self.players[new_player.name] = new_player
+        self.players_alive.add(new_player)
+        bisect.insort(self.sorted_players, new_player)
+        self.version += 1
         return True
 
     def remove_player(self, name):
         if name in self.players:
-            del self.players[name]
+            p = self.players.pop(name)
+            self.players_alive.remove(p)
+            i = bisect.bisect_left(self.sorted_players, p)
+            while self.sorted_players[i] is not p:
+                i += 1
+            del self.sorted_players[i]
+            self.version += 1
             return True
         return False
 
-    def start(self):
+    def start(self, events=None):
+        """events - The compiled tables to play with. Defaults to the library's current ones."""
+        self.events = events if events is not None else eventpacks.library.tables
+        self.roster = self.players_sorted
+        self.roster_index = {p.name: i for i, p in enumerate(self.roster)}
+        self.players_alive = TributePool(self.roster)
         self.total_players_alive = len(self.players)
         self.has_started = True
+        self.version += 1
 
     def step(self):
-        if self.total_players_alive is 1:
+        finished = self.__finished()
+        if finished is not None:
+            return finished
+
+        start = time.perf_counter()
+        step_type, event, records, killed = self.__play_round()
+        metrics.round_seconds.labels(step_type.value).observe(time.perf_counter() - start)
+        metrics.rounds.labels(step_type.value).inc()
+        metrics.round_messages.labels(step_type.value).observe(len(records))
+
+        summary = {
+            'day': self.day,
+            'roundType': step_type.value,
+            'actions': records,
+            'footer': "Tributes Remaining: {0}/{1} | Host: {2}"
+                      .format(self.total_players_alive, len(self.players), self.owner_name)
+        }
+
+        if step_type is RoundType.FALLEN:
+            summary['title'] = "{0} | {1}".format(self.title, "Fallen Tributes {0}".format(self.day))
+            if len(records) > 1:
+                summary['description'] = "{0} cannon shots can be heard in the distance.".format(len(records))
+            elif len(records) == 1:
+                summary['description'] = "1 cannon shot can be heard in the distance."
+            else:
+                summary['description'] = "No cannon shots are heard."
+            summary['color'] = 0xaaaaaa
+        else:
+            summary['title'] = "{0} | {1}".format(self.title, event.title.format(self.day))
+            summary['description'] = event.description
+            summary['color'] = event.color
+
+        return summary
+
+    def run_to_completion(self, render=False):
+        """
+        Plays a started game to the end without building any display summaries.
+
+        Returns the winner (None if everyone died), the number of rounds played, the names of the tributes
+        killed in each round and every tribute's kill count. With render=True the formatted messages of each
+        round are also returned under 'messages'.
+        """
+        results = {'winner': None, 'district': None, 'rounds': 0, 'deaths': []}
+
+        finished = self.__finished()
+        while finished is None:
+            killed = self.__play_round()[3]
+            results['rounds'] += 1
+            results['deaths'].append([self.roster[i].name for i in killed])
+            finished = self.__finished()
+
+        if render:
+            results['messages'] = [self.render_round(step_type, records) for _, step_type, _, records in self.history]
+
+        if finished.get('winner') is not None:
+            results['winner'] = finished['winner']
+            results['district'] = finished['district']
+        results['kills'] = {p.name: p.kills for p in self.players.values()}
+        return results
+
+    def render_action(self, record):
+        action_id, tributes = record
+        return self.events['actions'][action_id].template.render([self.roster[i] for i in tributes])
+
+    def render_round(self, step_type, records):
+        if step_type is RoundType.FALLEN:
+            return ["☠️ {0} | District {1}".format(self.roster[i], self.roster[i].district) for i in records]
+        return [self.render_action(r) for r in records]
+
+    def describe_death(self, player):
+        if player.cause_of_death is None:
+            return None
+        return self.render_action(player.cause_of_death)
+
+    def transcript(self):
+        """Renders every round played so far as a list of (title, description, messages)."""
+        rounds = []
+        for day, step_type, arena, records in self.history:
+            if step_type is RoundType.FALLEN:
+                title = "Fallen Tributes {0}".format(day)
+                description = None
+            else:
+                event = self.events['arena'][arena] if arena is not None else self.events[step_type.value]
+                title = event.title.format(day)
+                description = event.description
+            rounds.append((title, description, self.render_round(step_type, records)))
+        return rounds
+
+    def __finished(self):
+        if self.total_players_alive == 1:
             self.has_started = False
-            for p in self.players.values():
-                if p.alive is True:
-                    return {'winner': p.name, 'district': p.district}
-                
-        if self.total_players_alive is 0:
+            p = next(iter(self.players_alive))
+            return {'winner': p.name, 'district': p.district}
+
+        if self.total_players_alive == 0:
             self.has_started = False
             return {'allDead': True}
 
+        return None
+
+    def __play_round(self):
         if self.night_passed:
             self.day += 1
             self.days_since_last_event += 1
@@ -69,17 +256,17 @@ class Game:
             self.night_passed = False
 
         feast_chance = 100 * (math.pow(self.days_since_last_event, 2) / 55.0) + (9.0 / 55.0)
-        fatality_factor = random.randint(2, 4) + self.consecutive_rounds_without_deaths
+        fatality_factor = self.rng.randint(2, 4) + self.consecutive_rounds_without_deaths
 
-        if self.day is 1 and not self.bloodbath_passed:
+        if self.day == 1 and not self.bloodbath_passed:
             step_type = RoundType.BLOODBATH
             fatality_factor += 2
             self.bloodbath_passed = True
-        elif not self.day_passed and random.randint(0, 100) < feast_chance:
+        elif not self.day_passed and self.rng.randint(0, 100) < feast_chance:
             step_type = RoundType.FEAST
             self.days_since_last_event = 0
             fatality_factor += 2
-        elif self.days_since_last_event > 0 and random.randint(1, 20) is 1:
+        elif self.days_since_last_event > 0 and self.rng.randint(1, 20) == 1:
             step_type = RoundType.ARENA
             self.days_since_last_event = 0
             fatality_factor += 1
@@ -93,93 +280,56 @@ class Game:
             step_type = RoundType.NIGHT
             self.night_passed = True
 
-        self.players_available_to_act = {p for p in self.players.values() if p.alive is True}
-
         event = None
+        arena = None
+        killed = []
         if step_type is RoundType.FALLEN:
-            messages = []
-            for p in self.players_dead_today:
-                messages.append("☠️ {0} | District {1}".format(p, p.district))
+            records = [self.roster_index[p.name] for p in self.players_dead_today]
+            self.players_dead_today.clear()
         else:
             if step_type is RoundType.ARENA:
-                event = events['arena'][random.randint(0, len(events['arena']) - 1)]
+                arena = self.rng.randrange(len(self.events['arena']))
+                event = self.events['arena'][arena]
             else:
-                event = events[step_type.value]
-            dead_players_now = len(self.players) - self.total_players_alive
-            messages = self.__generate_messages(fatality_factor, event)
-            if len(self.players) - self.total_players_alive == dead_players_now:
+                event = self.events[step_type.value]
+            dead_players_now = len(self.players_dead_today)
+            self.players_available_to_act = self.players_alive.copy()
+            records = self.__generate_actions(fatality_factor, event)
+            killed = [self.roster_index[p.name] for p in self.players_dead_today[dead_players_now:]]
+            if len(killed) == 0:
                 self.consecutive_rounds_without_deaths += 1
             else:
                 self.consecutive_rounds_without_deaths = 0
 
-        summary = {
-            'day': self.day,
-            'roundType': step_type.value,
-            'messages': messages,
-            'footer': "Tributes Remaining: {0}/{1} | Host: {2}"
-                      .format(self.total_players_alive, len(self.players), self.owner_name)
-        }
-
-        if step_type is RoundType.FALLEN:
-            summary['title'] = "{0} | {1}".format(self.title, "Fallen Tributes {0}".format(self.day))
-            if len(self.players_dead_today) > 1:
-                summary['description'] = "{0} cannon shots can be heard in the distance.".format(
-                    len(self.players_dead_today))
-                self.players_dead_today.clear()
-            elif len(self.players_dead_today) is 1:
-                summary['description'] = "1 cannon shot can be heard in the distance."
-                self.players_dead_today.clear()
-            else:
-                summary['description'] = "No cannon shots are heard."
-            summary['color'] = 0xaaaaaa
-        else:
-            summary['title'] = "{0} | {1}".format(self.title, event['title'].format(self.day))
-            summary['description'] = event['description']
-            summary['color'] = event['color']
-
-        return summary
+        self.history.append((self.day, step_type, arena, records))
+        return step_type, event, records, killed
 
-    def __generate_messages(self, fatality_factor, event):
-        messages = []
+    def __generate_actions(self, fatality_factor, event):
+        records = []
         while len(self.players_available_to_act) > 0:
-            f = random.randint(0, 10)
+            available = len(self.players_available_to_act)
+            action = None
+            f = self.rng.randint(0, 10)
             if f < fatality_factor and self.total_players_alive > 1:
                 # time to die
-                action = random.choice(event['fatal'])
-                if action['killed'] is list and len(action['killed']) >= self.total_players_alive:
-                    # must have one player remaining
-                    continue
-            else:
+                # must have one player remaining
+                action = event.pick_fatal(available, self.total_players_alive - 1, self.rng)
+            if action is None:
                 # live to see another round
-                action = random.choice(event['nonfatal'])
-
-            tributes = action['tributes']
-            if tributes > len(self.players_available_to_act):
-                # not enough tributes for this action
-                continue
-
-            p = random.choice(tuple(self.players_available_to_act))
-            self.players_available_to_act.remove(p)
-            active_players = [p]
-
-            extra_tributes = tributes - 1
-            while extra_tributes > 0:
-                p = random.choice(tuple(self.players_available_to_act))
-                self.players_available_to_act.remove(p)
-                active_players.append(p)
-                extra_tributes -= 1
-
-            msg = action['msg'].format(*active_players)
-
-            if action.get('killed') is not None:
-                if action.get('killer') is not None:
-                    for kr in action['killer']:
-                        active_players[kr].kills += len(action['killed'])
-                for kd in action['killed']:
-                    active_players[kd].alive = False
-                    self.players_dead_today.append(active_players[kd])
-                    self.total_players_alive -= 1
-                    active_players[kd].cause_of_death = msg
-
-            messages.append(msg)
-        return messages
+                action = event.pick_nonfatal(available, self.rng)
+
+            active_players = [self.players_available_to_act.pop_random(self.rng) for _ in range(action.tributes)]
+            record = (action.id, tuple(self.roster_index[p.name] for p in active_players))
+
+            for kr in action.killer:
+                active_players[kr].kills += action.victims
+            for kd in action.killed:
+                active_players[kd].alive = False
+                self.players_alive.remove(active_players[kd])
+                self.players_dead_today.append(active_players[kd])
+                self.total_players_alive -= 1
+                active_players[kd].cause_of_death = record
+                self.version += 1
+
+            records.append(record)
+        return records
@@ -3,16 +3,79 @@ import math
 
 from game import Game
 from player import Player
-from enums import ErrorCode
+from enums import ErrorCode, RoundType
+from odds import simulate_odds
+from registry import GameRegistry
+from store import GameStore
 
+MAX_PLAYERS = 24
+
+# Tournaments allow far larger rosters, so their rosters and rounds are summarized instead of listed in full
+TOURNAMENT_MAX_PLAYERS = 5000
+TOURNAMENT_LISTED_MESSAGES = 20
+
+# Bounds on how often, in seconds, an autoplaying game steps
+AUTOPLAY_MIN_INTERVAL = 5
+AUTOPLAY_MAX_INTERVAL = 3600
+
+# A game costs about as much to simulate as it has tributes, so odds plays fewer games for larger rosters to keep the
+# total work near ODDS_BUDGET tribute-games. Only the ODDS_LISTED_TRIBUTES likeliest winners are listed.
+ODDS_BUDGET = 240000
+ODDS_MIN_TRIALS = 50
+ODDS_LISTED_TRIBUTES = 20
 
-class HungerGames:
-    active_games = {}
 
-    def new_game(self, channel_id, owner_id, owner_name, title):
+def shard_of(guild_id, shard_count):
+    """The shard Discord delivers a guild's events to. Direct messages (no guild) always go to shard 0."""
+    if guild_id is None:
+        return 0
+    return (guild_id >> 22) % shard_count
+
+
+class HungerGames:
+    """
+    The games running on this process's shards.
+
+    shard_count - How many shards the bot runs as in total, across every process.
+    shard_ids - The shards this process runs. Defaults to all of them.
+    ttl, max_games, spill_dir - When sweep evicts games, as described in GameRegistry.
+    """
+
+    def __init__(self, store=None, shard_count=1, shard_ids=None, ttl=None, max_games=None, spill_dir=None):
+        self.store = store if store is not None else GameStore()
+        self.shard_count = shard_count
+        self.shard_ids = frozenset(shard_ids if shard_ids is not None else range(shard_count))
+        self.active_games = GameRegistry(ttl, max_games, spill_dir)
+        self.active_games.load({channel_id: game for channel_id, game in self.store.load_all(self.owns).items()
+                                if self.owns(game.guild_id)})
+
+    def owns(self, guild_id):
+        return shard_of(guild_id, self.shard_count) in self.shard_ids
+
+    def sweep(self, busy=()):
+        """Evicts abandoned games, returning their channels. Games that were not spilled are deleted from the store."""
+        evicted = self.active_games.sweep(busy)
+        for channel_id, game, spilled in evicted:
+            if not spilled:
+                self.store.delete(channel_id)
+        return [channel_id for channel_id, _, _ in evicted]
+
+    def flush(self):
+        """Encodes every unsaved game on this thread and flushes the store. Only safe while no game is in use."""
+        for channel_id in self.store.unsaved():
+            self.store.encode(channel_id)
+        self.store.flush()
+
+    def new_game(self, channel_id, owner_id, owner_name, title, seed=None, max_players=MAX_PLAYERS, guild_id=None):
+        if not self.owns(guild_id):
+            raise ValueError("Guild {0} belongs to shard {1}, which this process does not run"
+                             .format(guild_id, shard_of(guild_id, self.shard_count)))
         if channel_id in self.active_games:
             return ErrorCode.GAME_EXISTS
-        self.active_games[channel_id] = Game(owner_name, owner_id, title)
+        if max_players < 2 or max_players > TOURNAMENT_MAX_PLAYERS:
+            return ErrorCode.INVALID_MAX_PLAYERS
+        self.active_games[channel_id] = Game(owner_name, owner_id, title, seed, max_players, guild_id)
+        self.store.created(channel_id, self.active_games[channel_id])
         return True
 
     def add_player(self, channel_id, name, gender=None, volunteer=False):
@@ -22,7 +85,7 @@ class HungerGames:
 
         if this_game.has_started:
             return ErrorCode.GAME_STARTED
-        if len(this_game.players) >= 24:
+        if len(this_game.players) >= this_game.max_players:
             return ErrorCode.GAME_FULL
 
         if gender is not None:
@@ -50,6 +113,7 @@ class HungerGames:
         p = Player(name, district, is_male)
         if not this_game.add_player(p):
             return ErrorCode.PLAYER_EXISTS
+        self.store.player_added(channel_id, this_game, p)
         gender_symbol = "♂" if is_male else "♀"
         if volunteer:
             return "**District {0} {1} | {2}** volunteers as tribute!".format(p.district, gender_symbol, p.name)
@@ -65,6 +129,7 @@ class HungerGames:
 
         if not this_game.remove_player(name):
             return ErrorCode.PLAYER_DOES_NOT_EXIST
+        self.store.player_removed(channel_id, this_game, name)
         return "Player {0} was removed from the game.".format(name)
 
     def pad_players(self, channel_id, group):
@@ -74,12 +139,12 @@ class HungerGames:
 
         if this_game.has_started:
             return ErrorCode.GAME_STARTED
-        if len(this_game.players) >= 24:
+        if len(this_game.players) >= this_game.max_players:
             return ErrorCode.GAME_FULL
         if group is None:
             return ErrorCode.INVALID_GROUP
 
-        new_players = random.sample(group, min(24 - len(this_game.players), len(group)))
+        new_players = random.sample(group, min(this_game.max_players - len(this_game.players), len(group)))
         messages = []
         for p in new_players:
             if type(p) is tuple:
@@ -98,26 +163,58 @@ class HungerGames:
             return ErrorCode.NO_GAME
         this_game = self.active_games[channel_id]
 
-        player_list = []
-        for p in this_game.players_sorted:
-            gender_symbol = "♂" if p.is_male else "♀"
-            if p.alive:
-                player_list.append("District {0} {1} | {2}".format(p.district, gender_symbol, p.name))
-            else:
-                player_list.append("~~District {0} {1} | {2}~~".format(p.district, gender_symbol, p.name))
+        cached = this_game.render_cache.get('status')
+        if cached is not None and cached[0] == this_game.version:
+            return cached[1]
 
         summary = {
             'title': this_game.title,
-            'footer': "Players: {0}/24 | Host: {1}"
-                      .format(len(this_game.players), this_game.owner_name)
+            'footer': "Players: {0}/{1} | Host: {2}"
+                      .format(len(this_game.players), this_game.max_players, this_game.owner_name)
         }
 
-        if len(player_list) == 0:
+        if len(this_game.players) == 0:
             summary['description'] = "No players have joined yet"
+        elif self.__is_tournament(this_game):
+            summary['description'] = "{0} tributes have entered the tournament. {1} of them are still alive." \
+                .format(len(this_game.players), len(this_game.players_alive))
         else:
-            summary['description'] = "The following tributes are currently in the game:\n\n" + "\n".join(player_list)
+            summary['description'] = "The following tributes are currently in the game:\n\n" + \
+                                     self.__roster_lines(this_game)
+
+        this_game.render_cache['status'] = (this_game.version, summary)
         return summary
 
+    def odds(self, channel_id, member_id, trials=10000, workers=None):
+        if channel_id not in self.active_games:
+            return ErrorCode.NO_GAME
+        this_game = self.active_games[channel_id]
+
+        if member_id != this_game.owner_id:
+            return ErrorCode.NOT_OWNER
+        if this_game.has_started:
+            return ErrorCode.GAME_STARTED
+        if len(this_game.players) < 2:
+            return ErrorCode.NOT_ENOUGH_PLAYERS
+
+        roster = [(p.name, p.district, p.is_male) for p in this_game.players_sorted]
+        trials = max(ODDS_MIN_TRIALS, min(trials, ODDS_BUDGET // len(roster)))
+        results = simulate_odds(roster, trials, workers)
+
+        ranked = sorted(roster, key=lambda t: -results['tributes'][t[0]]['win'])
+        player_list = []
+        for name, district, is_male in ranked[:ODDS_LISTED_TRIBUTES]:
+            odds = results['tributes'][name]
+            gender_symbol = "♂" if is_male else "♀"
+            player_list.append("District {0} {1} | {2} | {3:.1%} to win, {4:.2f} kills, survives {5:.1f} rounds"
+                               .format(district, gender_symbol, name, odds['win'], odds['kills'], odds['survival']))
+        if len(ranked) > ODDS_LISTED_TRIBUTES:
+            player_list.append("...and {0} more.".format(len(ranked) - ODDS_LISTED_TRIBUTES))
+
+        return {'title': "{0} | The Odds".format(this_game.title),
+                'footer': "Simulated Games: {0} | Host: {1}".format(results['trials'], this_game.owner_name),
+                'description': "May the odds be ever in your favor!\n\n{0}".format("\n".join(player_list))}
+
     def start_game(self, channel_id, member_id, prefix):
         if channel_id not in self.active_games:
             return ErrorCode.NO_GAME
@@ -130,16 +227,19 @@ class HungerGames:
         if len(this_game.players) < 2:
             return ErrorCode.NOT_ENOUGH_PLAYERS
 
+        # Everyone is still alive, so the roster last shown by status can be reused as is
+        if self.__is_tournament(this_game):
+            player_list = "{0} tributes from {1} districts have been reaped." \
+                .format(len(this_game.players), this_game.sorted_players[-1].district)
+        else:
+            player_list = self.__roster_lines(this_game)
         this_game.start()
-        player_list = []
-        for p in this_game.players_sorted:
-            gender_symbol = "♂" if p.is_male else "♀"
-            player_list.append("District {0} {1} | {2}".format(p.district, gender_symbol, p.name))
+        self.store.started(channel_id, this_game)
 
         return {'title': "{0} | The Reaping".format(this_game.title),
                 'footer': "Total Players: {0} | Owner {1}".format(len(this_game.players), this_game.owner_name),
                 'description': "The Reaping has concluded! Here are the tributes:\n\n{0}\n\n{1}, you may now "
-                               "proceed the simulation with `{2}step`.".format("\n".join(player_list),
+                               "proceed the simulation with `{2}step`.".format(player_list,
                                                                                this_game.owner_name, prefix)}
 
     def end_game(self, channel_id, owner_id):
@@ -149,8 +249,25 @@ class HungerGames:
         if owner_id != this_game.owner_id:
             return ErrorCode.NOT_OWNER
 
+        self.store.delete(channel_id)
         return self.active_games.pop(channel_id)
 
+    def autoplay(self, channel_id, member_id, interval):
+        """Checks that the game in the channel may autoplay, stepping every interval seconds (or None to stop)."""
+        if channel_id not in self.active_games:
+            return ErrorCode.NO_GAME
+        this_game = self.active_games[channel_id]
+
+        if member_id != this_game.owner_id:
+            return ErrorCode.NOT_OWNER
+        if interval is None:
+            return True
+        if not this_game.has_started:
+            return ErrorCode.GAME_NOT_STARTED
+        if not AUTOPLAY_MIN_INTERVAL <= interval <= AUTOPLAY_MAX_INTERVAL:
+            return ErrorCode.INVALID_INTERVAL
+        return True
+
     def step(self, channel_id, member_id):
         # TODO: Let moderators also step
         # TODO: Allow for group skip override
@@ -165,6 +282,11 @@ class HungerGames:
 
         summary = this_game.step()
 
+        if summary.get('winner') is not None or summary.get('allDead') is not None:
+            self.store.delete(channel_id)
+        else:
+            self.store.stepped(channel_id, this_game)
+
         if summary.get('winner') is not None:
             self.active_games.pop(channel_id)
             return {
@@ -183,16 +305,47 @@ class HungerGames:
                 'footer': None
             }
 
-        if summary['description'] is not None and len(summary['messages']) > 0:
-            formatted_msg = "{0}\n\n> {1}".format(summary['description'], "\n> ".join(summary['messages']))
+        records = summary['actions']
+        hidden = 0
+        if self.__is_tournament(this_game) and len(records) > TOURNAMENT_LISTED_MESSAGES:
+            hidden = len(records) - TOURNAMENT_LISTED_MESSAGES
+            records = records[:TOURNAMENT_LISTED_MESSAGES]
+        messages = this_game.render_round(RoundType(summary['roundType']), records)
+        if hidden > 0:
+            messages.append("...and {0} more.".format(hidden))
+        if summary['description'] is not None and len(messages) > 0:
+            formatted_msg = "{0}\n\n> {1}".format(summary['description'], "\n> ".join(messages))
         elif summary['description'] is not None:
             formatted_msg = summary['description']
         else:
-            formatted_msg = "> {0}".format("\n> ".join(summary['messages']))
+            formatted_msg = "> {0}".format("\n> ".join(messages))
 
         return {
             'title': summary['title'],
             'color': summary['color'],
             'description': formatted_msg,
-            'footer': summary['footer']
+            'footer': summary['footer'],
+            'header': summary['description'],
+            'messages': messages
         }
+
+    @staticmethod
+    def __roster_lines(game):
+        cached = game.render_cache.get('roster')
+        if cached is not None and cached[0] == game.version:
+            return cached[1]
+
+        player_list = []
+        for p in game.sorted_players:
+            gender_symbol = "♂" if p.is_male else "♀"
+            if p.alive:
+                player_list.append("District {0} {1} | {2}".format(p.district, gender_symbol, p.name))
+            else:
+                player_list.append("~~District {0} {1} | {2}~~".format(p.district, gender_symbol, p.name))
+        lines = "\n".join(player_list)
+        game.render_cache['roster'] = (game.version, lines)
+        return lines
+
+    @staticmethod
+    def __is_tournament(game):
+        return game.max_players > MAX_PLAYERS
@@ -1,16 +1,70 @@
+import asyncio
 import discord
 import re
+import time
 from discord.ext import commands
 
 from default_players import default_players
-from hungergames import HungerGames
+from asyncgames import AsyncHungerGames
+from hungergames import HungerGames, TOURNAMENT_MAX_PLAYERS, AUTOPLAY_MIN_INTERVAL, AUTOPLAY_MAX_INTERVAL
+from eventpacks import library
+from validator import EventPackError
+from journal import JournalStore
+from paginate import paginate
+from store import GameStore, SQLiteStore
 from enums import ErrorCode
-from bot import HungryBot
+from bot import HungryBot, DiscordTransport
+from sendqueue import SendQueue
+from scheduler import Scheduler
+import metrics
 from config import config
 
 prefix = '''h$'''
-bot = HungryBot(command_prefix=prefix, description="A Hunger Games simulator bot")
-hg = HungerGames()
+# Without a shard_count Discord picks one and this process runs every shard
+bot = HungryBot(command_prefix=prefix, description="A Hunger Games simulator bot",
+                shard_count=config.get('shard_count'), shard_ids=config.get('shard_ids'))
+bot.outbox = SendQueue(DiscordTransport(bot))
+if config.get('journal'):
+    store = JournalStore(config['journal'],
+                         on_error=lambda e: print("A game could not be recovered and was set aside: {0}".format(e)))
+elif config.get('database'):
+    store = SQLiteStore(config['database'])
+else:
+    store = GameStore()
+hg = HungerGames(store, config.get('shard_count') or 1, config.get('shard_ids'),
+                 config.get('game_ttl'), config.get('max_games'), config.get('spill_dir'))
+
+# Every command goes through here so simulations run off the event loop, one at a time per channel
+games = AsyncHungerGames(hg)
+
+
+async def flush_games():
+    # Every change made during a tick is written out together in one transaction, off the event loop
+    while True:
+        await asyncio.sleep(1)
+        await games.flush()
+
+
+bot.loop.create_task(flush_games())
+
+
+async def sweep_games():
+    while True:
+        await asyncio.sleep(60)
+        for channel_id in await games.sweep():
+            autoplayer.cancel(channel_id)
+
+
+bot.loop.create_task(sweep_games())
+
+
+async def autostep(channel_ids):
+    await asyncio.gather(*(__autostep(channel_id) for channel_id in channel_ids), return_exceptions=True)
+
+
+# Steps every autoplaying game as it comes due
+autoplayer = Scheduler(autostep)
+bot.loop.create_task(autoplayer.run())
 
 
 @bot.event
@@ -18,6 +72,41 @@ async def on_ready():
     print('Logged in!')
 
 
+if config.get('watch_packs'):
+    library.watch(on_error=lambda e: print("Event packs were not reloaded: {0}".format(e)))
+
+
+def __game_counts():
+    running = sum(1 for g in list(hg.active_games.values()) if g.has_started)
+    return [(('pending',), len(hg.active_games) - running), (('running',), running)]
+
+
+metrics.registry.register(metrics.Gauge(
+    'hungrybot_active_games', "Games in memory, by whether they have started.", ('state',), __game_counts))
+metrics.registry.register(metrics.Gauge(
+    'hungrybot_autoplaying_games', "Games stepping themselves.", (), lambda: [((), len(autoplayer))]))
+metrics.registry.register(metrics.Counter(
+    'hungrybot_evictions_total', "Abandoned games evicted, by reason.", ('reason',),
+    lambda: [((reason,), n) for reason, n in hg.active_games.evictions.items()]))
+metrics.registry.register(metrics.Gauge(
+    'hungrybot_send_queue_depth', "Messages waiting to be sent.", (), lambda: [((), bot.outbox.depth)]))
+metrics.registry.register(metrics.Gauge(
+    'hungrybot_send_queue_max_wait_seconds', "Longest any message has waited to be sent.", (),
+    lambda: [((), bot.outbox.max_wait)]))
+if config.get('metrics_port'):
+    metrics.serve(metrics.registry, config['metrics_port'])
+
+
+@bot.before_invoke
+async def start_timer(ctx):
+    ctx.started = time.perf_counter()
+
+
+@bot.after_invoke
+async def record_latency(ctx):
+    metrics.command_seconds.labels(ctx.command.qualified_name).observe(time.perf_counter() - ctx.started)
+
+
 @bot.command()
 async def ping(ctx):
     """Pong!"""
@@ -40,13 +129,39 @@ async def new(ctx, *, title: str = None):
         title = __sanitize_here_everyone(title)
         title = __sanitize_special_chars(title)
     owner = ctx.author
-    ret = hg.new_game(ctx.channel.id, owner.id, owner.name, title)
+    ret = await games.new_game(ctx.channel.id, owner.id, owner.name, title, guild_id=ctx.guild.id)
     if not await __check_errors(ctx, ret):
         return
     await ctx.send("{0} has started {1}! Use `{2}add [-m|-f] <name>` to add a player or `{2}join [-m|-f]` to enter the "
                    "game yourself!".format(owner.mention, title, prefix))
 
 
+@bot.command(rest_is_raw=True)
+@commands.guild_only()
+async def tournament(ctx, max_players: int, *, title: str = None):
+    """
+    Start a new large-scale Hunger Games tournament in the current channel.
+    Rosters and rounds are summarized instead of listed in full.
+
+    max_players - The maximum number of tributes, up to 5000.
+    title - (Optional) The title of the simulation. Defaults to 'The Hunger Games Tournament'
+    """
+    if title is None or title.strip() == "":
+        title = "The Hunger Games Tournament"
+    else:
+        title = __strip_mentions(ctx.message, title)
+        title = __sanitize_here_everyone(title)
+        title = __sanitize_special_chars(title)
+    owner = ctx.author
+    ret = await games.new_game(ctx.channel.id, owner.id, owner.name, title, max_players=max_players,
+                               guild_id=ctx.guild.id)
+    if not await __check_errors(ctx, ret):
+        return
+    await ctx.send("{0} has started {1} for up to {2} tributes! Use `{3}add [-m|-f] <name>` to add a player, "
+                   "`{3}join [-m|-f]` to enter the game yourself or `{3}fill` to fill it with members of this "
+                   "server!".format(owner.mention, title, max_players, prefix))
+
+
 @bot.command()
 @commands.guild_only()
 async def join(ctx, gender=None):
@@ -56,7 +171,7 @@ async def join(ctx, gender=None):
     gender (Optional) - Use `-m` or `-f` to set male or female gender. Defaults to a random gender.
     """
     name = ctx.author.nick if ctx.author.nick is not None else ctx.author.name
-    ret = hg.add_player(ctx.channel.id, name, gender=gender, volunteer=True)
+    ret = await games.add_player(ctx.channel.id, name, gender=gender, volunteer=True)
     if not await __check_errors(ctx, ret):
         return
     await ctx.reply(ret)
@@ -76,7 +191,7 @@ async def add(ctx, *, name: str):
     name = __sanitize_here_everyone(name)
     name = __sanitize_special_chars(name)
 
-    ret = hg.add_player(ctx.channel.id, name)
+    ret = await games.add_player(ctx.channel.id, name)
     if not await __check_errors(ctx, ret):
         return
     await ctx.send(ret)
@@ -95,7 +210,7 @@ async def remove(ctx, *, name: str):
     name = __sanitize_here_everyone(name)
     name = __sanitize_special_chars(name)
 
-    ret = hg.remove_player(ctx.channel.id, name)
+    ret = await games.remove_player(ctx.channel.id, name)
     if not await __check_errors(ctx, ret):
         return
     await ctx.send(ret)
@@ -119,7 +234,7 @@ async def fill(ctx, group_name=None):
     else:
         group = default_players.get(group_name)
 
-    ret = hg.pad_players(ctx.channel.id, group)
+    ret = await games.pad_players(ctx.channel.id, group)
     if not await __check_errors(ctx, ret):
         return
     await ctx.send(ret)
@@ -131,7 +246,21 @@ async def status(ctx):
     """
     Gets the status for the game in the channel.
     """
-    ret = hg.status(ctx.channel.id)
+    ret = await games.status(ctx.channel.id)
+    if not await __check_errors(ctx, ret):
+        return
+    embed = discord.Embed(title=ret['title'], description=ret['description'])
+    embed.set_footer(text=ret['footer'])
+    await ctx.send(embed=embed)
+
+
+@bot.command()
+@commands.guild_only()
+async def odds(ctx):
+    """
+    Simulates the pending game many times and shows the likeliest winners' chances. Only the host can do this.
+    """
+    ret = await games.odds(ctx.channel.id, ctx.author.id)
     if not await __check_errors(ctx, ret):
         return
     embed = discord.Embed(title=ret['title'], description=ret['description'])
@@ -145,7 +274,7 @@ async def start(ctx):
     """
     Starts the pending game in the channel.
     """
-    ret = hg.start_game(ctx.channel.id, ctx.author.id, prefix)
+    ret = await games.start_game(ctx.channel.id, ctx.author.id, prefix)
     if not await __check_errors(ctx, ret):
         return
     embed = discord.Embed(title=ret['title'], description=ret['description'])
@@ -159,9 +288,10 @@ async def end(ctx):
     """
     Cancels the current game in the channel.
     """
-    ret = hg.end_game(ctx.channel.id, ctx.author.id)
+    ret = await games.end_game(ctx.channel.id, ctx.author.id)
     if not await __check_errors(ctx, ret):
         return
+    autoplayer.cancel(ctx.channel.id)
     await ctx.send("{0} has been cancelled. Anyone may now start a new game with `{1}new`.".format(ret.title, prefix))
 
 
@@ -171,18 +301,81 @@ async def step(ctx):
     """
     Steps forward the current game in the channel by one round.
     """
-    ret = hg.step(ctx.channel.id, ctx.author.id)
+    ret = await games.step(ctx.channel.id, ctx.author.id)
     if not await __check_errors(ctx, ret):
         return
-    embed = discord.Embed(title=ret['title'], color=ret['color'], description=ret['description'])
-    if ret['footer'] is not None:
-        embed.set_footer(text=ret['footer'])
-    await ctx.send(embed=embed)
+    for page in paginate(ret):
+        await ctx.send(embed=__round_embed(page))
+
+
+@bot.command()
+@commands.guild_only()
+async def autoplay(ctx, interval: str):
+    """
+    Steps the current game in the channel automatically.
+
+    interval - How many seconds to wait between rounds, or 'off' to go back to stepping by hand.
+    """
+    if interval.lower() == "off":
+        seconds = None
+    else:
+        try:
+            seconds = float(interval)
+        except ValueError:
+            seconds = -1
+    ret = await games.autoplay(ctx.channel.id, ctx.author.id, seconds)
+    if not await __check_errors(ctx, ret):
+        return
+    if seconds is None:
+        autoplayer.cancel(ctx.channel.id)
+        await ctx.reply("Autoplay stopped. Use `{0}step` to continue the game.".format(prefix))
+        return
+    autoplayer.schedule(ctx.channel.id, seconds)
+    await ctx.reply("The game will now step every {0:g} seconds. Use `{1}autoplay off` to stop."
+                    .format(seconds, prefix))
+
+
+@bot.command()
+@commands.is_owner()
+async def reload(ctx):
+    """
+    Reloads the event packs without restarting. Games already running keep their current events.
+    Only the bot's owner may use this command.
+    """
+    try:
+        version = await bot.loop.run_in_executor(None, library.reload)
+    except EventPackError as e:
+        await ctx.reply("The event packs were not reloaded:\n```\n{0}\n```".format("\n".join(e.errors[:10])))
+        return
+    await ctx.reply("Event packs reloaded (version {0}).".format(version))
+
+
+async def __autostep(channel_id):
+    this_game = hg.active_games.get(channel_id)
+    ret = await games.step(channel_id, this_game.owner_id) if this_game is not None else ErrorCode.NO_GAME
+    if type(ret) is ErrorCode or ret.get('messages') is None:
+        # The game has ended, one way or another
+        autoplayer.cancel(channel_id)
+    if type(ret) is ErrorCode:
+        return
+    try:
+        for page in paginate(ret):
+            await bot.outbox.send(channel_id, embed=__round_embed(page))
+    except discord.HTTPException:
+        autoplayer.cancel(channel_id)
+
+
+def __round_embed(page):
+    embed = discord.Embed(title=page['title'], color=page['color'], description=page['description'])
+    if page['footer'] is not None:
+        embed.set_footer(text=page['footer'])
+    return embed
 
 
 async def __check_errors(ctx, error_code):
     if type(error_code) is not ErrorCode:
         return True
+    metrics.errors.labels(error_code.name).inc()
     if error_code is ErrorCode.NO_GAME:
         await ctx.reply("There is no game currently running in this channel.")
         return False
@@ -217,6 +410,13 @@ async def __check_errors(ctx, error_code):
     if error_code is ErrorCode.PLAYER_DOES_NOT_EXIST:
         await ctx.reply("There is no player with that name in this game.")
         return False
+    if error_code is ErrorCode.INVALID_MAX_PLAYERS:
+        await ctx.reply("A game must allow between 2 and {0} tributes.".format(TOURNAMENT_MAX_PLAYERS))
+        return False
+    if error_code is ErrorCode.INVALID_INTERVAL:
+        await ctx.reply("Autoplay must wait between {0} and {1} seconds between rounds."
+                        .format(AUTOPLAY_MIN_INTERVAL, AUTOPLAY_MAX_INTERVAL))
+        return False
 
 
 def __strip_mentions(message: discord.Message, text):
@@ -252,4 +452,7 @@ def __sanitize_special_chars(text):
     return text.strip()
 
 
-bot.run(config['token'])
+try:
+    bot.run(config['token'])
+finally:
+    store.close()
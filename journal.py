@@ -0,0 +1,249 @@
+import os
+import pickle
+import queue
+import struct
+import threading
+import time
+
+from enums import RoundType
+from game import Game, StaleGameError
+from player import Player
+from store import GameStore
+
+# Every record is a header of its type and payload length, followed by the payload
+HEADER = struct.Struct('<BI')
+
+CREATE, ADD, REMOVE, START, STEP, SNAPSHOT, END = range(1, 8)
+
+
+class JournalError(ValueError):
+    pass
+
+
+class JournalStore(GameStore):
+    """
+    Persists games as one append-only journal per channel.
+
+    Each change appends a small record: the game's creation (with its seed), every player added or removed, the start
+    and the outcome of every round. Every snapshot_interval rounds the whole game is also written, so recovery only
+    replays the rounds after the last snapshot. Records are buffered until flush, which hands them to a writer thread.
+    Journals are named for their channel and guild, so a process sharing the directory with others only ever opens
+    the journals of its own shards. Journals of finished games are moved to the done directory, where they remain for
+    auditing. So are journals that can't be recovered, after passing the error to on_error, so that one bad journal
+    never stops the others loading.
+    """
+
+    def __init__(self, directory, snapshot_interval=20, on_error=None):
+        self.directory = directory
+        self.done_directory = os.path.join(directory, "done")
+        self.snapshot_interval = snapshot_interval
+        self.on_error = on_error
+        self.guilds = {}
+        self.pending = []
+        self.pending_lock = threading.Lock()
+        self.steps_since_snapshot = {}
+        self.batches = queue.Queue()
+        os.makedirs(self.done_directory, exist_ok=True)
+
+        self.writer = threading.Thread(target=self.__write_batches, name="game-journal-writer", daemon=True)
+        self.writer.start()
+
+    def created(self, channel_id, game):
+        self.guilds[channel_id] = game.guild_id
+        self.__append(channel_id, CREATE, (game.owner_name, game.owner_id, game.title, game.seed, game.max_players,
+                                                game.guild_id))
+        self.steps_since_snapshot[channel_id] = 0
+
+    def player_added(self, channel_id, game, player):
+        self.__append(channel_id, ADD, (player.name, player.district, player.is_male))
+
+    def player_removed(self, channel_id, game, name):
+        self.__append(channel_id, REMOVE, (name,))
+
+    def started(self, channel_id, game):
+        self.__append(channel_id, START, ())
+
+    def stepped(self, channel_id, game):
+        day, step_type, arena, records = game.history[-1]
+        self.__append(channel_id, STEP, (day, step_type.value, arena, records))
+        self.steps_since_snapshot[channel_id] = self.steps_since_snapshot.get(channel_id, 0) + 1
+        if self.steps_since_snapshot[channel_id] >= self.snapshot_interval:
+            self.save(channel_id, game)
+
+    def save(self, channel_id, game):
+        self.__append(channel_id, SNAPSHOT, game)
+        self.steps_since_snapshot[channel_id] = 0
+
+    def delete(self, channel_id):
+        self.__append(channel_id, END, ())
+        self.steps_since_snapshot.pop(channel_id, None)
+
+    def load_all(self, owns=None):
+        games = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".journal"):
+                continue
+            channel_id, guild_id = (int(x) if x != "dm" else None for x in filename[:-len(".journal")].split("-"))
+            if owns is not None and not owns(guild_id):
+                # Another process may be writing to it right now
+                continue
+            self.guilds[channel_id] = guild_id
+            path = os.path.join(self.directory, filename)
+            # Every change is appended, so the journal was last written when the game was last changed
+            last_used = os.path.getmtime(path)
+            try:
+                game, tail = recover(path)
+            except (JournalError, StaleGameError) as e:
+                os.replace(self.path(channel_id), self.done_path(channel_id))
+                if self.on_error is not None:
+                    self.on_error(e)
+                continue
+            if game is not None:
+                game.last_used = last_used
+                games[channel_id] = game
+                self.steps_since_snapshot[channel_id] = tail
+        return games
+
+    def flush(self):
+        # Records are encoded when they are appended, so a game changing elsewhere cannot affect them
+        with self.pending_lock:
+            if len(self.pending) == 0:
+                return
+            pending, self.pending = self.pending, []
+        self.batches.put(pending)
+
+    def sync(self):
+        """Blocks until every flushed record has been written."""
+        self.batches.join()
+
+    def close(self):
+        self.flush()
+        self.batches.put(None)
+        self.writer.join()
+
+    def path(self, channel_id):
+        guild_id = self.guilds[channel_id]
+        name = "{0}-{1}.journal".format(channel_id, "dm" if guild_id is None else guild_id)
+        return os.path.join(self.directory, name)
+
+    def done_path(self, channel_id):
+        return os.path.join(self.done_directory, "{0}-{1}.journal".format(channel_id, time.time_ns()))
+
+    def __append(self, channel_id, record_type, payload):
+        record = self.__record(record_type, payload)
+        with self.pending_lock:
+            self.pending.append((channel_id, record))
+
+    @staticmethod
+    def __record(record_type, payload):
+        data = pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(record_type, len(data)) + data
+
+    def __write_batches(self):
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                self.batches.task_done()
+                break
+            files = {}
+            for channel_id, record in batch:
+                if channel_id not in files:
+                    files[channel_id] = open(self.path(channel_id), 'ab')
+                files[channel_id].write(record)
+                if record[0] == END:
+                    files.pop(channel_id).close()
+                    os.replace(self.path(channel_id), self.done_path(channel_id))
+            for f in files.values():
+                f.close()
+            self.batches.task_done()
+
+
+def scan_records(data):
+    """
+    Returns the (type, offset, length) of every complete record in a journal's bytes, without decoding any payload.
+
+    A record cut short by a crash mid-write ends the scan.
+    """
+    headers = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        record_type, length = HEADER.unpack_from(data, offset)
+        if offset + HEADER.size + length > len(data):
+            break
+        headers.append((record_type, offset + HEADER.size, length))
+        offset += HEADER.size + length
+    return headers
+
+
+def read_records(path):
+    """Reads a journal front to back, yielding each record as (type, payload)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    view = memoryview(data)
+    for record_type, offset, length in scan_records(data):
+        yield record_type, pickle.loads(view[offset:offset + length])
+
+
+def recover(path):
+    """
+    Rebuilds a game from its journal, starting at the last snapshot and replaying the records after it.
+
+    Replayed rounds are checked against the journaled outcome, raising JournalError if they differ (as when the event
+    packs changed since the game was written), as is any record that can't be decoded or replayed. A record cut short
+    by a crash is cut off the end of the file, so records appended afterwards follow on from the last complete one.
+    Returns the game, or None if the journal has ended, and the number of rounds replayed.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    view = memoryview(data)
+    headers = scan_records(data)
+    end = headers[-1][1] + headers[-1][2] if len(headers) > 0 else 0
+    if end < len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+    if len(headers) == 0:
+        return None, 0
+
+    start = 0
+    for i, (record_type, _, _) in enumerate(headers):
+        if record_type == SNAPSHOT:
+            start = i
+
+    game = None
+    tail = 0
+    for record_type, offset, length in headers[start:]:
+        if record_type == END:
+            return None, 0
+        try:
+            game = __replay(path, game, record_type, pickle.loads(view[offset:offset + length]))
+        except (JournalError, StaleGameError):
+            raise
+        except Exception as e:
+            # Anything else means the record was damaged on disk, which leaves the journal just as unrecoverable
+            raise JournalError("{0}: record at byte {1} could not be replayed: {2!r}".format(path, offset, e)) from e
+        if record_type == STEP:
+            tail += 1
+    return game, tail
+
+
+def __replay(path, game, record_type, payload):
+    if record_type == SNAPSHOT:
+        return payload
+    if record_type == CREATE:
+        return Game(*payload)
+    if game is None:
+        raise JournalError("{0}: journal does not begin with its game's creation".format(path))
+    if record_type == ADD:
+        game.add_player(Player(*payload))
+    elif record_type == REMOVE:
+        game.remove_player(payload[0])
+    elif record_type == START:
+        game.start()
+    elif record_type == STEP:
+        game.step()
+        day, step_type, arena, records = payload
+        if game.history[-1] != (day, RoundType(step_type), arena, records):
+            raise JournalError("{0}: day {1} replayed differently than it was played".format(path, day))
+    else:
+        raise JournalError("{0}: unknown record type {1}".format(path, record_type))
+    return game
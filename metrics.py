@@ -0,0 +1,204 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds, from a fast status up to a tournament bloodbath
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MESSAGE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Registry:
+    """Every metric the bot keeps, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append("# HELP {0} {1}".format(metric.name, metric.help))
+            lines.append("# TYPE {0} {1}".format(metric.name, metric.type))
+            metric.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+class Metric:
+    """
+    A metric, optionally split by labels.
+
+    Look a label combination up once with labels() and keep the child to record into it cheaply. A metric given a
+    function instead reads its values when rendered, as a list of (label values, value) pairs.
+    """
+
+    type = None
+
+    def __init__(self, name, help, labelnames=(), function=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(values, self.child())
+        return child
+
+    def child(self):
+        raise NotImplementedError
+
+    def render(self, lines):
+        if self.function is not None:
+            for values, value in self.function():
+                lines.append("{0}{1} {2}".format(self.name, self.format_labels(values), format_value(value)))
+            return
+        for values, child in list(self.children.items()):
+            lines.append("{0}{1} {2}".format(self.name, self.format_labels(values), format_value(child.value)))
+
+    def format_labels(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if len(pairs) == 0:
+            return ""
+        return "{" + ",".join('{0}="{1}"'.format(k, escape_label(str(v))) for k, v in pairs) + "}"
+
+
+class CounterChild:
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def child(self):
+        return CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def child(self):
+        return GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def render(self, lines):
+        for values, child in list(self.children.items()):
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append("{0}_bucket{1} {2}".format(
+                    self.name, self.format_labels(values, [('le', format_value(bound))]), cumulative))
+            lines.append("{0}_sum{1} {2}".format(self.name, self.format_labels(values), format_value(total)))
+            lines.append("{0}_count{1} {2}".format(self.name, self.format_labels(values), cumulative))
+
+
+def serve(registry, port, host="127.0.0.1"):
+    """Serves the registry's metrics at /metrics from a background thread. Returns the server, to shut it down."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def format_value(value):
+    if type(value) is str:
+        return value
+    if value in (float('inf'), float('-inf')):
+        return "+Inf" if value > 0 else "-Inf"
+    if type(value) is int or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(text):
+    return text.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+registry = Registry()
+
+command_seconds = registry.register(Histogram(
+    'hungrybot_command_seconds', "Time taken to handle each command.", ('command',)))
+round_seconds = registry.register(Histogram(
+    'hungrybot_round_seconds', "Time taken to simulate each round.", ('round_type',)))
+rounds = registry.register(Counter(
+    'hungrybot_rounds_total', "Rounds simulated, by round type.", ('round_type',)))
+round_messages = registry.register(Histogram(
+    'hungrybot_round_messages', "Messages produced by each round.", ('round_type',), MESSAGE_BUCKETS))
+errors = registry.register(Counter(
+    'hungrybot_errors_total', "Commands refused, by error code.", ('error',)))
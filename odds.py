@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import eventpacks
+from game import Game, StaleGameError
+from player import Player
+from validator import EventPackError
+
+# The bot runs several threads, which a forked worker could inherit mid-lock, so workers are started from a clean
+# server process instead
+POOL_CONTEXT = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Every odds command shares one pool, so concurrent commands queue for the same workers instead of each starting more
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+
+__pool = None
+__pool_lock = threading.Lock()
+
+
+class OddsAccumulator:
+    """Running totals over simulated games, mergeable across workers."""
+
+    def __init__(self, roster):
+        self.trials = 0
+        self.wins = {name: 0 for name, _, _ in roster}
+        self.kills = {name: 0 for name, _, _ in roster}
+        self.survival = {name: 0 for name, _, _ in roster}
+        # A district survives until its last tribute dies
+        self.district_of = {name: district for name, district, _ in roster}
+        self.district_survival = {district: 0 for _, district, _ in roster}
+
+    def add(self, results):
+        self.trials += 1
+        survived = {}
+        if results['winner'] is not None:
+            self.wins[results['winner']] += 1
+            survived[results['winner']] = results['rounds']
+        for i, deaths in enumerate(results['deaths']):
+            for name in deaths:
+                survived[name] = i + 1
+        districts = {}
+        for name, rounds in survived.items():
+            self.survival[name] += rounds
+            district = self.district_of[name]
+            districts[district] = max(districts.get(district, 0), rounds)
+        for district, rounds in districts.items():
+            self.district_survival[district] += rounds
+        for name, kills in results['kills'].items():
+            self.kills[name] += kills
+
+    def merge(self, other):
+        self.trials += other.trials
+        for name in self.wins:
+            self.wins[name] += other.wins[name]
+            self.kills[name] += other.kills[name]
+            self.survival[name] += other.survival[name]
+        for district in self.district_survival:
+            self.district_survival[district] += other.district_survival[district]
+        return self
+
+
+def simulate_games(roster, trials, seed, digest):
+    """
+    Runs trials games of the given roster in this process and returns their accumulated totals.
+
+    digest - The digest of the event tables to play with. A worker started before a pack changed reloads the packs
+        to find them, and raises StaleGameError if the packs on disk no longer match either.
+    """
+    events = eventpacks.library.known.get(digest)
+    if events is None and eventpacks.library.changed():
+        try:
+            eventpacks.library.reload()
+        except (OSError, EventPackError):
+            pass
+        events = eventpacks.library.known.get(digest)
+    if events is None:
+        raise StaleGameError(digest)
+
+    rng = random.Random(seed)
+    acc = OddsAccumulator(roster)
+    for _ in range(trials):
+        g = Game(None, None, None, rng.getrandbits(64))
+        for name, district, is_male in roster:
+            g.add_player(Player(name, district, is_male))
+        g.start(events)
+        acc.add(g.run_to_completion())
+    return acc
+
+
+def pool():
+    """The worker pool shared by every simulation, started on first use."""
+    global __pool
+    with __pool_lock:
+        if __pool is None:
+            __pool = ProcessPoolExecutor(max_workers=POOL_WORKERS,
+                                         mp_context=multiprocessing.get_context(POOL_CONTEXT))
+        return __pool
+
+
+def simulate_odds(roster, trials=10000, workers=None, seed=None, chunk_size=1000):
+    """
+    Estimates each tribute's and district's chances by simulating the roster many times.
+
+    Games are played with the library's current event tables, which a game started now would play with.
+
+    roster - A list of (name, district, is_male) tuples.
+    trials - The number of games to simulate.
+    workers - 1 runs every game in the calling process, as does a run too short to split into chunks. Otherwise the
+        chunks go to the shared pool.
+    seed - Seeds the per-chunk RNGs. The same seed and chunk_size always give the same odds regardless of workers.
+    """
+    roster = [tuple(t) for t in roster]
+    digest = eventpacks.library.tables['digest']
+    master = random.Random(seed)
+    chunks = []
+    remaining = trials
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        chunks.append((n, master.getrandbits(64)))
+        remaining -= n
+
+    total = OddsAccumulator(roster)
+    if workers == 1 or len(chunks) == 1:
+        for n, chunk_seed in chunks:
+            total.merge(simulate_games(roster, n, chunk_seed, digest))
+    else:
+        futures = {pool().submit(simulate_games, roster, n, chunk_seed, digest): (n, chunk_seed)
+                   for n, chunk_seed in chunks}
+        for f in as_completed(futures):
+            try:
+                total.merge(f.result())
+            except StaleGameError:
+                # The packs on disk changed without being reloaded here, so only this process still has the tables
+                total.merge(simulate_games(roster, *futures[f], digest))
+    return summarize(roster, total)
+
+
+def summarize(roster, acc):
+    trials = max(acc.trials, 1)
+    tributes = {}
+    districts = {}
+    for name, district, _ in roster:
+        tributes[name] = {
+            'district': district,
+            'win': acc.wins[name] / trials,
+            'kills': acc.kills[name] / trials,
+            'survival': acc.survival[name] / trials
+        }
+        d = districts.setdefault(district, {'win': 0.0, 'kills': 0.0,
+                                            'survival': acc.district_survival[district] / trials})
+        d['win'] += tributes[name]['win']
+        d['kills'] += tributes[name]['kills']
+    return {'trials': acc.trials, 'tributes': tributes, 'districts': districts}
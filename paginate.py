@@ -0,0 +1,58 @@
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FOOTER_LIMIT = 2048
+EMBED_LIMIT = 6000
+
+# Room kept at the end of every title for the page number
+PAGE_NUMBER_RESERVE = len(" (9999/9999)")
+
+
+def paginate(embed):
+    """
+    Splits an embed summary into as many as Discord will accept, in the order they should be sent.
+
+    embed - A summary like HungerGames.step returns. If it lists its 'messages' (with an optional 'header' shown
+    above them), they are quoted one per line and split across pages between messages. Only the first page shows the
+    header and only the last the footer. Each page's title is numbered when there is more than one.
+    """
+    title = embed['title'][:TITLE_LIMIT - PAGE_NUMBER_RESERVE]
+    footer = embed.get('footer')
+    if footer is not None:
+        footer = footer[:FOOTER_LIMIT]
+    messages = embed.get('messages')
+    if not messages:
+        description = embed.get('description')
+        if description is not None:
+            description = description[:DESCRIPTION_LIMIT]
+        return [{'title': title, 'color': embed.get('color'), 'description': description, 'footer': footer}]
+
+    # Every page may be the last, so every page leaves room for the footer
+    budget = min(DESCRIPTION_LIMIT, EMBED_LIMIT - TITLE_LIMIT - len(footer or ""))
+
+    descriptions = []
+    lines = []
+    size = -1
+    header = embed.get('header')
+    if header is not None:
+        lines = [header[:budget - 1], ""]
+        size = len(lines[0]) + 1
+    for message in messages:
+        line = "> " + message
+        if len(line) > budget:
+            line = line[:budget]
+        if size + 1 + len(line) > budget:
+            descriptions.append("\n".join(lines))
+            lines = []
+            size = -1
+        lines.append(line)
+        size += 1 + len(line)
+    descriptions.append("\n".join(lines))
+
+    pages = []
+    for i, description in enumerate(descriptions):
+        pages.append({'title': title if len(descriptions) == 1 else
+                      "{0} ({1}/{2})".format(title, i + 1, len(descriptions)),
+                      'color': embed.get('color'),
+                      'description': description,
+                      'footer': footer if i == len(descriptions) - 1 else None})
+    return pages
@@ -1,11 +1,44 @@
+PRONOUNS = (
+    {
+        'he_she': "she",
+        'he_she_cap': "She",
+        'him_her': "her",
+        'him_her_cap': "Her",
+        'himself_herself': "herself",
+        'himself_herself_cap': "Herself",
+        'his_her': "her",
+        'his_her_cap': "Her"
+    },
+    {
+        'he_she': "he",
+        'he_she_cap': "He",
+        'him_her': "him",
+        'him_her_cap': "Him",
+        'himself_herself': "himself",
+        'himself_herself_cap': "Himself",
+        'his_her': "his",
+        'his_her_cap': "His"
+    }
+)
+
+
 class Player:
+    # Pronouns are copied from the shared table into slots so templates like {0.his_her} read them directly.
+    # The sort key and hash are computed once, so name, district and is_male must not change after creation.
+    __slots__ = ('name', 'district', 'is_male', 'alive', 'kills', 'cause_of_death', 'sort_key', 'hash') \
+        + tuple(PRONOUNS[0])
+
     def __init__(self, name, district, is_male: bool = True):
         self.name = name
         self.district = district
         self.is_male = is_male
         self.alive = True
         self.kills = 0
-        self.cause_of_death = ""
+        self.cause_of_death = None
+        self.sort_key = (district, not is_male, name)
+        self.hash = hash((district, is_male, name))
+        for field, pronoun in PRONOUNS[bool(is_male)].items():
+            setattr(self, field, pronoun)
 
     def __str__(self):
         return self.name
@@ -19,64 +52,16 @@ class Player:
         return self.name != other.name or self.district != other.district or self.is_male != other.is_male
 
     def __lt__(self, other):
-        return (self.district, not self.is_male, self.name) < (other.district, not other.is_male, other.name)
+        return self.sort_key < other.sort_key
 
     def __le__(self, other):
-        return (self.district, not self.is_male, self.name) <= (other.district, not other.is_male, other.name)
+        return self.sort_key <= other.sort_key
 
     def __gt__(self, other):
-        return (self.district, not self.is_male, self.name) > (other.district, not other.is_male, other.name)
+        return self.sort_key > other.sort_key
 
     def __ge__(self, other):
-        return (self.district, not self.is_male, self.name) >= (other.district, not other.is_male, other.name)
+        return self.sort_key >= other.sort_key
 
     def __hash__(self):
-        return hash((self.district, self.is_male, self.name))
-
-    @property
-    def he_she(self):
-        if self.is_male:
-            return "he"
-        return "she"
-
-    @property
-    def he_she_cap(self):
-        if self.is_male:
-            return "He"
-        return "She"
-
-    @property
-    def him_her(self):
-        if self.is_male:
-            return "him"
-        return "her"
-
-    @property
-    def him_her_cap(self):
-        if self.is_male:
-            return "Him"
-        return "Her"
-
-    @property
-    def himself_herself(self):
-        if self.is_male:
-            return "himself"
-        return "herself"
-
-    @property
-    def himself_herself_cap(self):
-        if self.is_male:
-            return "Himself"
-        return "Herself"
-
-    @property
-    def his_her(self):
-        if self.is_male:
-            return "his"
-        return "her"
-
-    @property
-    def his_her_cap(self):
-        if self.is_male:
-            return "His"
-        return "Her"
+        return self.hash
@@ -0,0 +1,60 @@
+import random
+
+
+class TributePool:
+    """An unordered set of tributes supporting O(1) add, remove and random draws.
+
+    Tributes are kept in a list with a map from tribute to list position. Removal swaps
+    the last tribute into the freed slot so the list never has holes.
+    """
+
+    def __init__(self, tributes=()):
+        self.tributes = []
+        self.positions = {}
+        for t in tributes:
+            self.add(t)
+
+    def __len__(self):
+        return len(self.tributes)
+
+    def __contains__(self, tribute):
+        return tribute in self.positions
+
+    def __iter__(self):
+        return iter(self.tributes)
+
+    def add(self, tribute):
+        if tribute in self.positions:
+            return False
+        self.positions[tribute] = len(self.tributes)
+        self.tributes.append(tribute)
+        return True
+
+    def remove(self, tribute):
+        if tribute not in self.positions:
+            return False
+        self.__remove_at(self.positions.pop(tribute))
+        return True
+
+    def pop_random(self, rng=random):
+        i = rng.randrange(len(self.tributes))
+        tribute = self.tributes[i]
+        del self.positions[tribute]
+        self.__remove_at(i)
+        return tribute
+
+    def copy(self):
+        pool = TributePool()
+        pool.tributes = self.tributes.copy()
+        pool.positions = self.positions.copy()
+        return pool
+
+    def clear(self):
+        self.tributes.clear()
+        self.positions.clear()
+
+    def __remove_at(self, i):
+        last = self.tributes.pop()
+        if i < len(self.tributes):
+            self.tributes[i] = last
+            self.positions[last] = i
@@ -0,0 +1,192 @@
+import collections
+import os
+import pickle
+import threading
+import time
+
+
+class GameRegistry(collections.OrderedDict):
+    """
+    The active games by channel, kept in least recently used order so abandoned games can be evicted.
+
+    Looking a game up marks it used by moving it to the end, which is all a command pays. sweep walks from the front,
+    so it only ever looks at the games it evicts plus one. The time of use is also kept on the game as last_used, so a
+    game saved and loaded again by load keeps its idle time across restarts.
+
+    ttl - Seconds a game may go unused before it is evicted, or None to keep idle games.
+    max_games - How many games to keep at most, evicting the least recently used beyond that, or None for no cap.
+    spill_dir - Where evicted games are pickled to, to be restored transparently when their channel is next used.
+        Without one, evicted games are gone. sweep only sets evicted games aside, and write_spill writes each out, so
+        the disk work can be kept off the event loop. Callers on the event loop should likewise restore a channel
+        that has_spill before looking it up, since a lookup restores it on the spot.
+    """
+
+    def __init__(self, ttl=None, max_games=None, spill_dir=None, clock=time.time):
+        super().__init__()
+        self.ttl = ttl
+        self.max_games = max_games
+        self.spill_dir = spill_dir
+        self.clock = clock
+        self.used = {}
+        self.spilled = set()
+        self.spilling = {}
+        self.spill_lock = threading.Lock()
+        self.evictions = {'ttl': 0, 'lru': 0}
+        self.restored = 0
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spilled = {int(f[:-len(".pickle")]) for f in os.listdir(spill_dir) if f.endswith(".pickle")}
+
+    def __contains__(self, channel_id):
+        if super().__contains__(channel_id):
+            return True
+        if self.has_spill(channel_id):
+            return self.restore(channel_id)
+        return False
+
+    def __getitem__(self, channel_id):
+        game = super().__getitem__(channel_id)
+        self.move_to_end(channel_id)
+        game.last_used = self.used[channel_id] = self.clock()
+        return game
+
+    def __setitem__(self, channel_id, game):
+        super().__setitem__(channel_id, game)
+        self.move_to_end(channel_id)
+        game.last_used = self.used[channel_id] = self.clock()
+        if self.has_spill(channel_id):
+            # The game is live again, so its spilled copy is now stale
+            self.__discard_spill(channel_id)
+
+    def load(self, games):
+        """
+        Adds games saved by an earlier run, given by channel, keeping the time each was last used.
+
+        Games whose channel has a spill are left out, since the spill was written when they were evicted and is
+        restored on their next use instead.
+        """
+        for channel_id, game in sorted(games.items(), key=lambda item: item[1].last_used):
+            if self.has_spill(channel_id):
+                continue
+            super().__setitem__(channel_id, game)
+            self.used[channel_id] = game.last_used
+
+    def __delitem__(self, channel_id):
+        super().__delitem__(channel_id)
+        del self.used[channel_id]
+
+    def pop(self, channel_id, *default):
+        self.used.pop(channel_id, None)
+        return super().pop(channel_id, *default)
+
+    def clear(self):
+        super().clear()
+        self.used.clear()
+
+    def sweep(self, busy=()):
+        """
+        Evicts every game idle for longer than ttl, then the least recently used games beyond max_games.
+
+        busy - Channels with a call in progress. Their games are never removed, only moved behind the rest with their
+            last use kept, so the next sweep looks at them again.
+        Returns the evicted games as (channel_id, game, spilled) tuples. Spilled games are only set aside for
+        write_spill, and are restored from memory if they are used before it runs.
+        """
+        now = self.clock()
+        evicted = []
+        first_skipped = None
+        while super().__len__() > 0:
+            channel_id = next(iter(self.keys()))
+            if channel_id == first_skipped:
+                # Every game left has been looked at
+                break
+            if self.ttl is not None and now - self.used[channel_id] > self.ttl:
+                reason = 'ttl'
+            elif self.max_games is not None and super().__len__() > self.max_games:
+                reason = 'lru'
+            else:
+                break
+            if channel_id in busy:
+                self.move_to_end(channel_id)
+                if first_skipped is None:
+                    first_skipped = channel_id
+                continue
+            game = self.pop(channel_id)
+            self.evictions[reason] += 1
+            if self.spill_dir is not None:
+                with self.spill_lock:
+                    self.spilling[channel_id] = game
+            evicted.append((channel_id, game, self.spill_dir is not None))
+        return evicted
+
+    def has_spill(self, channel_id):
+        """Whether channel_id's game was evicted and can still be restored."""
+        return channel_id in self.spilling or channel_id in self.spilled
+
+    def restore(self, channel_id):
+        """
+        Brings channel_id's evicted game back, returning whether there was one to restore.
+
+        A spill that can't be loaded, whether damaged or written by a process with other event tables, is discarded so
+        the channel can start over.
+        """
+        with self.spill_lock:
+            game = self.spilling.pop(channel_id, None)
+            from_disk = game is None and channel_id in self.spilled
+            self.spilled.discard(channel_id)
+        if from_disk:
+            path = self.__spill_path(channel_id)
+            try:
+                with open(path, 'rb') as f:
+                    game = pickle.load(f)
+            except Exception:
+                game = None
+            self.__remove(path)
+        if game is None:
+            return False
+        self[channel_id] = game
+        self.restored += 1
+        return True
+
+    def write_spill(self, channel_id):
+        """
+        Pickles channel_id's game to spill_dir, if sweep set it aside.
+
+        This waits on disk, so it belongs in an executor, while nothing else uses the channel.
+        """
+        game = self.spilling.get(channel_id)
+        if game is None:
+            return
+        path = self.__spill_path(channel_id)
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(game, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        with self.spill_lock:
+            if self.spilling.get(channel_id) is game:
+                del self.spilling[channel_id]
+                self.spilled.add(channel_id)
+                return
+        # Restored while it was being written
+        self.__remove(path)
+
+    def write_spills(self):
+        for channel_id in list(self.spilling):
+            self.write_spill(channel_id)
+
+    def __discard_spill(self, channel_id):
+        with self.spill_lock:
+            self.spilling.pop(channel_id, None)
+            if channel_id not in self.spilled:
+                return
+            self.spilled.discard(channel_id)
+        self.__remove(self.__spill_path(channel_id))
+
+    @staticmethod
+    def __remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def __spill_path(self, channel_id):
+        return os.path.join(self.spill_dir, "{0}.pickle".format(channel_id))
@@ -0,0 +1,65 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class Scheduler:
+    """
+    Calls back every key that comes due, repeating at each key's interval, from a single task for all of them.
+
+    Due times are kept in one heap. The task wakes once per resolution seconds and hands every key that came due in
+    the meantime to callback(keys) as one batch, so the cost of a wakeup depends on how many keys are due rather than
+    how many are scheduled. Cancelled and rescheduled keys leave stale heap entries behind, which are skipped once
+    they come due.
+    """
+
+    def __init__(self, callback, resolution=1.0, clock=time.monotonic, sleep=asyncio.sleep):
+        self.callback = callback
+        self.resolution = resolution
+        self.clock = clock
+        self.sleep = sleep
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def schedule(self, key, interval):
+        """Calls key back every interval seconds from now, replacing any schedule it had."""
+        self.__push(key, interval, self.clock() + interval)
+
+    def cancel(self, key):
+        return self.entries.pop(key, None) is not None
+
+    def pop_due(self):
+        """Removes every key that has come due and schedules each one's next call."""
+        now = self.clock()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            when, entry_id, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            if entry is None or entry[1] != entry_id:
+                continue
+            due.append(key)
+            # A key that fell more than a whole interval behind skips the calls it missed
+            interval = entry[0]
+            self.__push(key, interval, when + interval if when + interval > now else now + interval)
+        return due
+
+    async def run(self):
+        while True:
+            await self.sleep(self.resolution)
+            due = self.pop_due()
+            if due:
+                # A slow batch must not hold back the next ones
+                asyncio.ensure_future(self.callback(due))
+
+    def __push(self, key, interval, when):
+        entry_id = next(self.counter)
+        self.entries[key] = (interval, entry_id)
+        heapq.heappush(self.heap, (when, entry_id, key))
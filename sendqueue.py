@@ -0,0 +1,171 @@
+import asyncio
+import collections
+import time
+
+# Discord's limits on sending messages: 5 per 5 seconds in a channel, 50 per second across the bot
+CHANNEL_RATE = 1.0
+CHANNEL_BURST = 5
+GLOBAL_RATE = 50.0
+GLOBAL_BURST = 50
+
+MESSAGE_LIMIT = 2000
+
+
+class TokenBucket:
+    """Allows burst sends at once, then refills at rate tokens per second."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def delay(self, now):
+        """Seconds until a token is available, refilling first."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class Outgoing:
+    __slots__ = ('content', 'embed', 'queued', 'futures')
+
+    def __init__(self, content, embed, queued, future):
+        self.content = content
+        self.embed = embed
+        self.queued = queued
+        self.futures = [future]
+
+
+class SendQueue:
+    """
+    Queues outgoing messages so the bot stays within Discord's rate limits instead of relying on its retries.
+
+    Each channel sends in order, limited by its own token bucket and a global one shared by every channel. Plain text
+    messages waiting next to each other in a channel are sent as one, so a burst of add confirmations costs a single
+    request.
+
+    transport - Has a coroutine send(channel_id, content, embed) that actually sends a message.
+    """
+
+    def __init__(self, transport, clock=time.monotonic, sleep=asyncio.sleep,
+                 channel_rate=CHANNEL_RATE, channel_burst=CHANNEL_BURST,
+                 global_rate=GLOBAL_RATE, global_burst=GLOBAL_BURST):
+        self.transport = transport
+        self.clock = clock
+        self.sleep = sleep
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock())
+
+        self.queues = {}
+        self.buckets = {}
+        self.workers = {}
+        self.prune_at = 64
+
+        self.depth = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def send(self, channel_id, content=None, embed=None):
+        """Queues a message, returning a future for the transport's result once it is sent."""
+        future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(channel_id, collections.deque()).append(
+            Outgoing(content, embed, self.clock(), future))
+        self.depth += 1
+        if channel_id not in self.workers:
+            if len(self.buckets) >= self.prune_at:
+                self.__prune()
+            self.workers[channel_id] = asyncio.ensure_future(self.__drain(channel_id))
+        return future
+
+    def metrics(self):
+        return {
+            'depth': self.depth,
+            'channels': len(self.queues),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'mean_wait': self.total_wait / self.waits if self.waits > 0 else 0.0,
+            'max_wait': self.max_wait
+        }
+
+    async def join(self):
+        """Waits until every queued message has been sent."""
+        while self.workers:
+            await asyncio.gather(*list(self.workers.values()), return_exceptions=True)
+
+    async def __drain(self, channel_id):
+        queue = self.queues[channel_id]
+        bucket = self.buckets.get(channel_id)
+        if bucket is None:
+            bucket = self.buckets[channel_id] = TokenBucket(self.channel_rate, self.channel_burst, self.clock())
+        try:
+            while queue:
+                await self.__acquire(bucket)
+                await self.__acquire(self.global_bucket)
+                message = self.__coalesce(queue)
+                try:
+                    result = await self.transport.send(channel_id, message.content, message.embed)
+                except Exception as e:
+                    for future in message.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in message.futures:
+                        if not future.done():
+                            future.set_result(result)
+                self.sent += 1
+        finally:
+            del self.workers[channel_id]
+            del self.queues[channel_id]
+
+    def __prune(self):
+        # A full bucket behaves exactly like a fresh one, so only those of recently busy channels are worth keeping
+        now = self.clock()
+        for channel_id, bucket in list(self.buckets.items()):
+            if channel_id not in self.workers and bucket.delay(now) == 0.0 and bucket.tokens >= bucket.capacity:
+                del self.buckets[channel_id]
+        self.prune_at = max(64, 2 * len(self.buckets))
+
+    async def __acquire(self, bucket):
+        delay = bucket.delay(self.clock())
+        while delay > 0:
+            await self.sleep(delay)
+            delay = bucket.delay(self.clock())
+        bucket.take()
+
+    def __coalesce(self, queue):
+        now = self.clock()
+        message = queue.popleft()
+        self.__dequeued(message, now)
+        if message.embed is not None or message.content is None:
+            return message
+        parts = [message.content]
+        size = len(message.content)
+        while queue and queue[0].embed is None and queue[0].content is not None \
+                and size + 1 + len(queue[0].content) <= MESSAGE_LIMIT:
+            following = queue.popleft()
+            self.__dequeued(following, now)
+            self.coalesced += 1
+            parts.append(following.content)
+            size += 1 + len(following.content)
+            message.futures.extend(following.futures)
+        message.content = "\n".join(parts)
+        return message
+
+    def __dequeued(self, message, now):
+        wait = now - message.queued
+        self.depth -= 1
+        self.waits += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
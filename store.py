@@ -0,0 +1,167 @@
+import pickle
+import queue
+import sqlite3
+import threading
+
+from game import StaleGameError
+
+
+class GameStore:
+    """
+    Where HungerGames keeps its games so they survive a restart.
+
+    HungerGames reports every change through the hooks below, which save the whole game by default. Hooks, save and
+    delete must return immediately, and may be called from executor threads while flush runs on the event loop. A
+    store that needs more than that to capture a game, such as pickling it, lists the game's channel in unsaved and
+    does the work in encode, which is called off the event loop while nothing else uses the channel's game. flush is
+    called once per tick to write out everything encoded since the last one. This base store keeps nothing.
+    """
+
+    def created(self, channel_id, game):
+        self.save(channel_id, game)
+
+    def player_added(self, channel_id, game, player):
+        self.save(channel_id, game)
+
+    def player_removed(self, channel_id, game, name):
+        self.save(channel_id, game)
+
+    def started(self, channel_id, game):
+        self.save(channel_id, game)
+
+    def stepped(self, channel_id, game):
+        self.save(channel_id, game)
+
+    def save(self, channel_id, game):
+        pass
+
+    def delete(self, channel_id):
+        pass
+
+    def load_all(self, owns=None):
+        """
+        Returns every saved game by channel.
+
+        owns - Called with each game's guild id, when given. Games it refuses belong to another process's shards, so
+            they are neither loaded nor changed in any way.
+        """
+        return {}
+
+    def unsaved(self):
+        return []
+
+    def encode(self, channel_id):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteStore(GameStore):
+    """
+    Persists games to a SQLite database with write-behind.
+
+    Saving a game only marks it dirty, however many times it changes. encode pickles it once, and flush hands every
+    pickle made since the last flush to a writer thread that commits them in a single transaction. Nothing ever waits
+    on disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dirty = {}
+        self.encoded = {}
+        self.dirty_lock = threading.Lock()
+        self.batches = queue.Queue()
+
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS games "
+                         "(channel_id INTEGER PRIMARY KEY, state BLOB NOT NULL, guild_id INTEGER)")
+            # Databases written before games were sharded have no guild_id, so their games all count as shard 0's
+            if "guild_id" not in [row[1] for row in conn.execute("PRAGMA table_info(games)")]:
+                conn.execute("ALTER TABLE games ADD COLUMN guild_id INTEGER")
+        conn.close()
+
+        self.writer = threading.Thread(target=self.__write_batches, name="game-store-writer", daemon=True)
+        self.writer.start()
+
+    def save(self, channel_id, game):
+        with self.dirty_lock:
+            self.dirty[channel_id] = game
+
+    def delete(self, channel_id):
+        with self.dirty_lock:
+            self.dirty.pop(channel_id, None)
+            self.encoded[channel_id] = (None, None)
+
+    def load_all(self, owns=None):
+        """Loads every saved game, dropping started games whose event tables are gone."""
+        games = {}
+        stale = []
+        conn = sqlite3.connect(self.path)
+        try:
+            for channel_id, state, guild_id in conn.execute("SELECT channel_id, state, guild_id FROM games"):
+                if owns is not None and not owns(guild_id):
+                    continue
+                try:
+                    games[channel_id] = pickle.loads(state)
+                except StaleGameError:
+                    stale.append((channel_id,))
+            with conn:
+                conn.executemany("DELETE FROM games WHERE channel_id = ?", stale)
+            return games
+        finally:
+            conn.close()
+
+    def unsaved(self):
+        with self.dirty_lock:
+            return list(self.dirty)
+
+    def encode(self, channel_id):
+        with self.dirty_lock:
+            game = self.dirty.pop(channel_id, None)
+        if game is None:
+            return
+        state = pickle.dumps(game, pickle.HIGHEST_PROTOCOL)
+        with self.dirty_lock:
+            self.encoded[channel_id] = (state, game.guild_id)
+
+    def flush(self):
+        with self.dirty_lock:
+            if len(self.encoded) == 0:
+                return
+            encoded, self.encoded = self.encoded, {}
+        self.batches.put(list(encoded.items()))
+
+    def sync(self):
+        """Blocks until every flushed batch has been committed."""
+        self.batches.join()
+
+    def close(self):
+        # Nothing else is using the games by now
+        for channel_id in self.unsaved():
+            self.encode(channel_id)
+        self.flush()
+        self.batches.put(None)
+        self.writer.join()
+
+    def __write_batches(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                self.batches.task_done()
+                break
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO games (channel_id, state, guild_id) VALUES (?, ?, ?)",
+                                 [(channel_id, state, guild_id) for channel_id, (state, guild_id) in batch
+                                  if state is not None])
+                conn.executemany("DELETE FROM games WHERE channel_id = ?",
+                                 [(channel_id,) for channel_id, (state, _) in batch if state is None])
+            self.batches.task_done()
+        conn.close()
@@ -0,0 +1,42 @@
+from string import Formatter
+
+
+class Template:
+    """
+    A message template parsed once into literal text and tribute slots.
+
+    "{0} hits {1.him_her}." compiles to the literals ("", " hits ", ".") and the slots ((0, 'name'), (1, 'him_her')).
+    Rendering joins the literals with the slot values read off the given tributes, without reparsing the template
+    the way str.format does on every call.
+    """
+
+    __slots__ = ('source', 'literals', 'slots')
+
+    def __init__(self, source):
+        self.source = source
+        literals = []
+        slots = []
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pending += literal
+            if field is None:
+                continue
+            if spec or conversion:
+                raise ValueError("Template '{0}' uses a format spec or conversion".format(source))
+            index, _, attribute = field.partition('.')
+            if not index.isdigit() or '.' in attribute or '[' in field:
+                raise ValueError("Template '{0}' has an invalid field '{{{1}}}'".format(source, field))
+            literals.append(pending)
+            pending = ""
+            slots.append((int(index), attribute or 'name'))
+        literals.append(pending)
+        self.literals = tuple(literals)
+        self.slots = tuple(slots)
+
+    def render(self, tributes):
+        literals = self.literals
+        parts = [literals[0]]
+        for n, (index, attribute) in enumerate(self.slots, 1):
+            parts.append(getattr(tributes[index], attribute))
+            parts.append(literals[n])
+        return "".join(parts)
@@ -0,0 +1,140 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+
+from asyncgames import AsyncHungerGames
+from hungergames import HungerGames
+from store import GameStore
+
+
+class RecordingStore(GameStore):
+
+    def __init__(self):
+        self.changed = set()
+        self.encoded = []
+        self.flushes = 0
+
+    def save(self, channel_id, game):
+        self.changed.add(channel_id)
+
+    def unsaved(self):
+        return list(self.changed)
+
+    def encode(self, channel_id):
+        self.changed.discard(channel_id)
+        self.encoded.append((channel_id, threading.get_ident()))
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestAsyncHungerGames(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hg = HungerGames(RecordingStore())
+        self.games = AsyncHungerGames(self.hg)
+
+    async def start(self, channel_id, tributes=12):
+        await self.games.new_game(channel_id, 0, "owner", "title", seed=channel_id)
+        for i in range(tributes):
+            await self.games.add_player(channel_id, "-m {0}".format(i))
+        await self.games.start_game(channel_id, 0, "h$")
+
+    async def test_steps_in_a_channel_never_interleave(self):
+        await self.start(0)
+        running = []
+        overlaps = []
+        step = self.hg.step
+
+        def tracked_step(channel_id, member_id):
+            overlaps.append(len(running))
+            running.append(threading.get_ident())
+            try:
+                return step(channel_id, member_id)
+            finally:
+                running.pop()
+
+        self.hg.step = tracked_step
+        results = await asyncio.gather(*(self.games.step(0, 0) for _ in range(20)))
+        self.assertEqual(overlaps, [0] * 20)
+
+        expected = HungerGames()
+        expected.new_game(0, 0, "owner", "title", seed=0)
+        for i in range(12):
+            expected.add_player(0, "-m {0}".format(i))
+        expected.start_game(0, 0, "h$")
+        self.assertEqual(results, [expected.step(0, 0) for _ in range(20)])
+
+    async def test_steps_run_off_the_event_loop(self):
+        await self.start(0)
+        loop_thread = threading.get_ident()
+        threads = []
+        step = self.hg.step
+        self.hg.step = lambda *args: threads.append(threading.get_ident()) or step(*args)
+        await self.games.step(0, 0)
+        self.assertNotEqual(threads, [loop_thread])
+
+    async def test_channels_are_released_when_idle(self):
+        await asyncio.gather(self.start(0), self.start(1))
+        await asyncio.gather(self.games.step(0, 0), self.games.step(1, 0), self.games.status(0))
+        self.assertEqual(self.games.locks, {})
+        self.assertEqual(self.games.waiting, {})
+
+    async def test_flush_encodes_off_the_loop_skipping_busy_channels(self):
+        await self.start(0)
+        await self.start(1)
+        started = threading.Event()
+        release = threading.Event()
+        step = self.hg.step
+
+        def slow_step(*args):
+            started.set()
+            release.wait()
+            return step(*args)
+
+        self.hg.step = slow_step
+        pending = asyncio.ensure_future(self.games.step(0, 0))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        await self.games.flush()
+        self.assertEqual([channel_id for channel_id, _ in self.hg.store.encoded], [1])
+        self.assertNotIn(threading.get_ident(), [thread for _, thread in self.hg.store.encoded])
+        self.assertEqual(self.hg.store.flushes, 1)
+        release.set()
+        await pending
+        await self.games.flush()
+        self.assertEqual([channel_id for channel_id, _ in self.hg.store.encoded], [1, 0])
+
+    async def test_sweep_spills_from_the_executor(self):
+        spill_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spill_dir)
+        self.hg = HungerGames(RecordingStore(), max_games=1, spill_dir=spill_dir)
+        self.games = AsyncHungerGames(self.hg)
+        await self.games.new_game(0, 0, "owner", "title")
+        await self.games.new_game(1, 0, "owner", "title")
+        registry = self.hg.active_games
+        write_spill = registry.write_spill
+        restore = registry.restore
+        threads = []
+
+        def tracked_write_spill(channel_id):
+            threads.append(threading.get_ident())
+            write_spill(channel_id)
+
+        def tracked_restore(channel_id):
+            threads.append(threading.get_ident())
+            return restore(channel_id)
+
+        registry.write_spill = tracked_write_spill
+        registry.restore = tracked_restore
+        self.assertEqual(await self.games.sweep(), [0])
+        self.assertEqual(registry.spilled, {0})
+        self.assertEqual((await self.games.add_player(0, "-m a"))[-len("tribute!"):], "tribute!")
+        self.assertEqual(registry.restored, 1)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,10 @@ class TestErrors(unittest.TestCase):
         self.hg.new_game(0, 0, "owner", "title")
         self.assertEqual(self.hg.new_game(0, None, None, "Title"), ErrorCode.GAME_EXISTS)
 
+    def test_newgame_invalidmaxplayers(self):
+        self.assertEqual(self.hg.new_game(0, 0, "owner", "title", max_players=1), ErrorCode.INVALID_MAX_PLAYERS)
+        self.assertEqual(self.hg.new_game(0, 0, "owner", "title", max_players=5001), ErrorCode.INVALID_MAX_PLAYERS)
+
     # Test Add Player
 
     def test_addplayer_nogame(self):
@@ -36,6 +40,12 @@ class TestErrors(unittest.TestCase):
             self.hg.add_player(0, str(i))
         self.assertEqual(self.hg.add_player(0, "test"), ErrorCode.GAME_FULL)
 
+    def test_addplayer_tournamentfull(self):
+        self.hg.new_game(0, 0, "owner", "title", max_players=100)
+        for i in range(100):
+            self.hg.add_player(0, str(i))
+        self.assertEqual(self.hg.add_player(0, "test"), ErrorCode.GAME_FULL)
+
     def test_addplayer_charlimit(self):
         self.hg.new_game(0, 0, "owner", "title")
         self.assertEqual(self.hg.add_player(0, "person with 33character long name"), ErrorCode.CHAR_LIMIT)
@@ -122,6 +132,28 @@ class TestErrors(unittest.TestCase):
         self.hg.new_game(0, 0, "owner", "title")
         self.assertEqual(self.hg.step(0, 0), ErrorCode.GAME_NOT_STARTED)
 
+    # Test Autoplay
+
+    def test_autoplay_nogame(self):
+        self.assertEqual(self.hg.autoplay(0, 0, 10), ErrorCode.NO_GAME)
+
+    def test_autoplay_notowner(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.assertEqual(self.hg.autoplay(0, 1, 10), ErrorCode.NOT_OWNER)
+
+    def test_autoplay_gamenotstarted(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.assertEqual(self.hg.autoplay(0, 0, 10), ErrorCode.GAME_NOT_STARTED)
+
+    def test_autoplay_invalidinterval(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.add_player(0, "test1")
+        self.hg.add_player(0, "test2")
+        self.hg.start_game(0, 0, "h$")
+        self.assertEqual(self.hg.autoplay(0, 0, 1), ErrorCode.INVALID_INTERVAL)
+        self.assertEqual(self.hg.autoplay(0, 0, float('nan')), ErrorCode.INVALID_INTERVAL)
+        self.assertTrue(self.hg.autoplay(0, 0, 10))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,169 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+
+from eventpacks import load_packs, pack_paths, read_pack, EventLibrary, PACK_DIR, DEFAULT_PACK
+from game import Game, StaleGameError
+from player import Player
+from validator import EventPackError
+
+extra_pack = {
+    'day': {
+        'nonfatal': [{'msg': "{0} admires the sunrise.", 'tributes': 1}]
+    },
+    'arena': [
+        {
+            'title': "Arena Event: Eclipse",
+            'description': "The sun vanishes.",
+            'color': "#000000",
+            'nonfatal': [{'msg': "{0} waits in the dark.", 'tributes': 1}],
+            'fatal': [{'msg': "{0} trips in the dark.", 'tributes': 1, 'killer': None, 'killed': [0]}]
+        }
+    ]
+}
+
+
+class TestEventPacks(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.dir, '__pycache__')
+        shutil.copy(os.path.join(PACK_DIR, DEFAULT_PACK), self.dir)
+        with open(os.path.join(self.dir, 'extra.json'), 'w') as f:
+            json.dump(extra_pack, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_default_pack_comes_first(self):
+        paths = pack_paths(self.dir)
+        self.assertEqual([os.path.basename(p) for p in paths], [DEFAULT_PACK, 'extra.json'])
+
+    def test_extra_pack_is_merged(self):
+        default = read_pack(os.path.join(PACK_DIR, DEFAULT_PACK))
+        compiled = load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertEqual(len(compiled['arena']), len(default['arena']) + 1)
+        self.assertEqual(compiled['arena'][-1].color, 0)
+        self.assertIn("{0} admires the sunrise.", [a.msg for a in compiled['day'].nonfatal[1]])
+
+    def test_compiled_tables_are_cached(self):
+        compiled = load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        cached = load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertEqual([a.msg for a in cached['actions']], [a.msg for a in compiled['actions']])
+
+    def test_changed_pack_misses_cache(self):
+        load_packs(pack_paths(self.dir), self.cache_dir)
+        with open(os.path.join(self.dir, 'extra.json'), 'w') as f:
+            json.dump({'day': {'nonfatal': [{'msg': "{0} naps.", 'tributes': 1}]}}, f)
+        compiled = load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertIn("{0} naps.", [a.msg for a in compiled['actions']])
+
+    def test_corrupt_cache_is_recompiled(self):
+        load_packs(pack_paths(self.dir), self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as f:
+                f.write(b"garbage")
+        compiled = load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertGreater(len(compiled['actions']), 0)
+
+    def test_invalid_pack_is_rejected(self):
+        with open(os.path.join(self.dir, 'extra.json'), 'w') as f:
+            json.dump({'day': {'nonfatal': [{'msg': "{0} and {1} rest.", 'tributes': 1}]}}, f)
+        with self.assertRaises(EventPackError) as cm:
+            load_packs(pack_paths(self.dir), self.cache_dir)
+        self.assertTrue(cm.exception.name.endswith('extra.json'))
+        self.assertEqual(len(cm.exception.errors), 1)
+
+
+class TestEventLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(PACK_DIR, DEFAULT_PACK), self.dir)
+        self.library = EventLibrary(self.dir, os.path.join(self.dir, '__pycache__'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_extra(self, pack):
+        path = os.path.join(self.dir, 'extra.json')
+        with open(path, 'w') as f:
+            json.dump(pack, f)
+        # Make sure the watcher sees a new mtime even on coarse filesystem clocks
+        os.utime(path, ns=(time.time_ns() + 10 ** 9, time.time_ns() + 10 ** 9))
+
+    def test_reload_swaps_tables(self):
+        old = self.library.tables
+        self.write_extra(extra_pack)
+        self.assertTrue(self.library.changed())
+        self.assertEqual(self.library.reload(), 2)
+        self.assertIsNot(self.library.tables, old)
+        self.assertEqual(len(self.library.tables['arena']), len(old['arena']) + 1)
+        self.assertFalse(self.library.changed())
+
+    def test_invalid_reload_keeps_tables(self):
+        old = self.library.tables
+        self.write_extra({'day': {'fatal': [{'msg': "{0}", 'tributes': 1, 'killed': [3]}]}})
+        with self.assertRaises(EventPackError):
+            self.library.reload()
+        self.assertIs(self.library.tables, old)
+        self.assertEqual(self.library.version, 1)
+
+    def test_running_game_keeps_its_tables(self):
+        import eventpacks
+        default_library = eventpacks.library
+        eventpacks.library = self.library
+        try:
+            g = Game("owner", 0, "title")
+            g.add_player(Player("a", 1))
+            g.add_player(Player("b", 1))
+            g.start()
+            old = g.events
+            self.write_extra(extra_pack)
+            self.library.reload()
+            g.step()
+            self.assertIs(g.events, old)
+            self.assertIs(pickle.loads(pickle.dumps(g)).events, old)
+            self.assertIs(Game("owner", 0, "title").events, self.library.tables)
+        finally:
+            eventpacks.library = default_library
+
+    def test_started_game_refused_without_its_tables(self):
+        import eventpacks
+        default_library = eventpacks.library
+        eventpacks.library = self.library
+        try:
+            pending = Game("owner", 0, "title")
+            pending.add_player(Player("a", 1))
+            pending.add_player(Player("b", 1))
+            started = pickle.loads(pickle.dumps(pending))
+            started.start()
+            states = pickle.dumps(pending), pickle.dumps(started)
+            self.write_extra(extra_pack)
+            # A fresh process only knows the tables of the packs as they are now
+            eventpacks.library = EventLibrary(self.dir, os.path.join(self.dir, '__pycache__'))
+            self.assertIs(pickle.loads(states[0]).events, eventpacks.library.tables)
+            with self.assertRaises(StaleGameError):
+                pickle.loads(states[1])
+        finally:
+            eventpacks.library = default_library
+
+    def test_watch_reloads_changes(self):
+        stop = self.library.watch(interval=0.01)
+        try:
+            self.write_extra(extra_pack)
+            deadline = time.time() + 5
+            while self.library.version == 1 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(self.library.version, 2)
+        finally:
+            stop.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from eventpacks import library
+from eventtable import compile_events, AliasTable, CompiledAction
+
+
+def all_events():
+    return [library.tables[k] for k in ('bloodbath', 'day', 'night', 'feast')] + library.tables['arena']
+
+
+class TestEventTable(unittest.TestCase):
+
+    def test_action_ids_index_actions(self):
+        for i, a in enumerate(library.tables['actions']):
+            self.assertEqual(a.id, i)
+
+    def test_nonfatal_buckets_are_feasible(self):
+        for e in all_events():
+            for t, bucket in enumerate(e.nonfatal):
+                for a in bucket:
+                    self.assertLessEqual(a.tributes, t)
+
+    def test_fatal_buckets_are_feasible(self):
+        for e in all_events():
+            for t, row in enumerate(e.fatal):
+                for v, bucket in enumerate(row):
+                    for a in bucket:
+                        self.assertLessEqual(a.tributes, t)
+                        self.assertLessEqual(a.victims, v)
+
+    def test_single_tribute_always_has_an_action(self):
+        for e in all_events():
+            self.assertLessEqual(e.pick_nonfatal(1).tributes, 1)
+
+    def test_pick_clamps_large_counts(self):
+        for e in all_events():
+            self.assertIsNotNone(e.pick_nonfatal(1000))
+
+    def test_event_without_single_tribute_nonfatal_rejected(self):
+        source = {k: {'title': k, 'description': "", 'color': 0,
+                      'nonfatal': [{'msg': "{0} and {1}", 'tributes': 2}], 'fatal': []}
+                  for k in ('bloodbath', 'day', 'night', 'feast')}
+        source['arena'] = []
+        with self.assertRaises(ValueError):
+            compile_events(source)
+
+
+class TestAliasTable(unittest.TestCase):
+
+    def table(self, weights):
+        return AliasTable(CompiledAction(i, {'msg': "{0}", 'tributes': 1, 'weight': w}) for i, w in enumerate(weights))
+
+    def test_sampled_frequencies_match_weights(self):
+        weights = [1, 2, 3, 4, 0.5, 9.5]
+        table = self.table(weights)
+        rng = random.Random(0)
+        draws = 200000
+        counts = [0] * len(weights)
+        for _ in range(draws):
+            counts[table.draw(rng).id] += 1
+        total = sum(weights)
+        for w, c in zip(weights, counts):
+            p = w / total
+            stderr = (p * (1 - p) / draws) ** 0.5
+            self.assertLess(abs(c / draws - p), 5 * stderr)
+
+    def test_uniform_weights_never_alias(self):
+        self.assertTrue(all(p == 1.0 for p in self.table([1] * 7).prob))
+
+    def test_single_action(self):
+        table = self.table([3])
+        self.assertEqual(table.draw(random.Random(0)).id, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from game import Game
+from game import Game, StaleGameError
 from player import Player
 
 
@@ -61,3 +62,112 @@ class TestGame(unittest.TestCase):
         self.g.start()
         self.assertTrue(self.g.has_started)
 
+    def test_step_always_leaves_a_survivor(self):
+        for seed in range(300):
+            random.seed(seed)
+            g = Game("owner", 0, "title")
+            for x in range(24):
+                g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+            g.start()
+            summary = g.step()
+            while summary.get('winner') is None:
+                self.assertIsNone(summary.get('allDead'))
+                self.assertGreaterEqual(g.total_players_alive, 1)
+                summary = g.step()
+
+    def test_run_to_completion_results(self):
+        random.seed(0)
+        for x in range(24):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        results = self.g.run_to_completion()
+        self.assertFalse(self.g.has_started)
+        self.assertIn(results['winner'], self.g.players)
+        self.assertEqual(results['rounds'], len(results['deaths']))
+        self.assertEqual(sum(len(d) for d in results['deaths']), 23)
+        self.assertNotIn('messages', results)
+
+    def test_run_to_completion_render(self):
+        random.seed(0)
+        for x in range(6):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        results = self.g.run_to_completion(render=True)
+        self.assertEqual(len(results['messages']), results['rounds'])
+        self.assertTrue(all(type(m) is str for r in results['messages'] for m in r))
+
+    def test_step_records_actions_not_text(self):
+        random.seed(0)
+        for x in range(6):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        summary = self.g.step()
+        self.assertNotIn('messages', summary)
+        for action_id, tributes in summary['actions']:
+            self.assertIsInstance(action_id, int)
+            self.assertTrue(all(0 <= i < 6 for i in tributes))
+
+    def test_transcript_matches_history(self):
+        random.seed(0)
+        for x in range(6):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        results = self.g.run_to_completion(render=True)
+        transcript = self.g.transcript()
+        self.assertEqual(len(transcript), results['rounds'])
+        self.assertEqual([messages for _, _, messages in transcript], results['messages'])
+        for p in self.g.players.values():
+            if not p.alive:
+                self.assertIn(p.name, self.g.describe_death(p))
+
+    def test_same_seed_same_game(self):
+        transcripts = []
+        for _ in range(2):
+            g = Game("owner", 0, "title", seed=1234)
+            for x in range(12):
+                g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+            g.start()
+            g.run_to_completion()
+            transcripts.append(g.transcript())
+        self.assertEqual(transcripts[0], transcripts[1])
+
+    def test_replay_from_record(self):
+        for x in reversed(range(12)):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        replayed = Game.replay(self.g.record())
+        self.assertEqual(self.g.run_to_completion(), replayed.run_to_completion())
+        self.assertEqual(self.g.transcript(), replayed.transcript())
+
+    def test_replay_refused_without_its_tables(self):
+        for x in range(4):
+            self.g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+        self.g.start()
+        record = self.g.record()
+        self.assertIs(Game.replay(record).events, self.g.events)
+        with self.assertRaises(StaleGameError):
+            Game.replay(dict(record, digest="packs since edited"))
+
+    def test_sorted_players_maintained_incrementally(self):
+        rng = random.Random(0)
+        names = [str(x) for x in range(30)]
+        rng.shuffle(names)
+        for name in names:
+            self.g.add_player(Player(name, rng.randint(1, 5), rng.random() < 0.5))
+        for name in names[:10]:
+            self.g.remove_player(name)
+        self.assertEqual(self.g.players_sorted, sorted(self.g.players.values()))
+
+    def test_version_bumps(self):
+        versions = [self.g.version]
+        self.g.add_player(Player("a", 1))
+        versions.append(self.g.version)
+        self.g.add_player(Player("b", 1))
+        self.g.add_player(Player("c", 2))
+        self.g.remove_player("c")
+        versions.append(self.g.version)
+        self.g.start()
+        versions.append(self.g.version)
+        self.g.run_to_completion()
+        versions.append(self.g.version)
+        self.assertEqual(versions, sorted(set(versions)))
@@ -12,3 +12,42 @@ class TestHungerGames(unittest.TestCase):
     def tearDown(self):
         self.hg.end_game(0, 0)
 
+    def test_tournament_round_output_is_bounded(self):
+        self.hg.new_game(0, 0, "owner", "title", seed=0, max_players=1000)
+        self.hg.pad_players(0, [str(i) for i in range(1000)])
+        start = self.hg.start_game(0, 0, "h$")
+        self.assertLess(len(start['description']), 500)
+        ret = self.hg.step(0, 0)
+        self.assertIn("more.", ret['description'])
+        self.assertLess(len(ret['description']), 4096)
+        self.assertLess(len(self.hg.status(0)['description']), 500)
+
+    def test_odds_is_for_the_host_and_bounded(self):
+        self.hg.new_game(0, 0, "owner", "title", max_players=300)
+        self.hg.pad_players(0, [str(i) for i in range(300)])
+        self.assertEqual(self.hg.odds(0, 1), ErrorCode.NOT_OWNER)
+        ret = self.hg.odds(0, 0, workers=1)
+        self.assertIn("Simulated Games: 800 |", ret['footer'])
+        self.assertEqual(ret['description'].count("to win"), 20)
+        self.assertIn("...and 280 more.", ret['description'])
+
+    def test_status_is_cached_until_the_game_changes(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.add_player(0, "-m b")
+        self.hg.add_player(0, "-f a")
+        first = self.hg.status(0)
+        self.assertIs(self.hg.status(0), first)
+        self.hg.add_player(0, "-m c")
+        second = self.hg.status(0)
+        self.assertIsNot(second, first)
+        self.assertIn("District 2 ♂ | c", second['description'])
+        self.hg.remove_player(0, "c")
+        self.assertNotIn("| c", self.hg.status(0)['description'])
+
+    def test_status_strikes_out_the_dead(self):
+        self.hg.new_game(0, 0, "owner", "title", seed=0)
+        self.hg.pad_players(0, [str(i) for i in range(10)])
+        start = self.hg.start_game(0, 0, "h$")
+        self.assertNotIn("~~", start['description'])
+        while "~~" not in self.hg.status(0)['description']:
+            self.hg.step(0, 0)
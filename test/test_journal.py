@@ -0,0 +1,176 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from game import Game
+from hungergames import HungerGames
+from journal import JournalStore, JournalError, HEADER, read_records, recover
+from journal import CREATE, ADD, REMOVE, START, STEP, SNAPSHOT
+
+
+class TestJournalStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = JournalStore(self.dir, snapshot_interval=4)
+        self.hg = HungerGames(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.hg.active_games.clear()
+        shutil.rmtree(self.dir)
+
+    def restart(self):
+        self.store.close()
+        self.hg.active_games.clear()
+        self.store = JournalStore(self.dir, snapshot_interval=4)
+        self.hg = HungerGames(self.store)
+
+    def play(self, channel_id, steps):
+        self.hg.new_game(channel_id, 0, "owner", "title", seed=3)
+        self.hg.pad_players(channel_id, [str(i) for i in range(12)])
+        self.hg.remove_player(channel_id, self.hg.active_games[channel_id].sorted_players[0].name)
+        self.hg.start_game(channel_id, 0, "h$")
+        for _ in range(steps):
+            self.hg.step(channel_id, 0)
+
+    def test_records_every_change(self):
+        self.play(0, 5)
+        self.store.flush()
+        self.store.sync()
+        types = [t for t, _ in read_records(self.store.path(0))]
+        self.assertEqual(types, [CREATE] + [ADD] * 12 + [REMOVE, START] + [STEP] * 4 + [SNAPSHOT, STEP])
+
+    def test_restored_game_plays_on_identically(self):
+        self.play(0, 6)
+        self.restart()
+        restored = self.hg.active_games[0]
+        self.assertEqual(self.store.steps_since_snapshot[0], 2)
+        expected = Game.replay(restored.record())
+        for _ in range(6):
+            expected.step()
+        self.assertEqual(restored.history, expected.history)
+        self.assertEqual(restored.run_to_completion(), expected.run_to_completion())
+
+    def test_restored_before_start(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.add_player(0, "-m a")
+        self.restart()
+        self.assertIn("a", self.hg.active_games[0].players)
+        self.assertFalse(self.hg.active_games[0].has_started)
+
+    def test_idle_time_taken_from_the_journal(self):
+        self.play(0, 1)
+        self.store.flush()
+        self.store.sync()
+        os.utime(self.store.path(0), (1000, 1000))
+        self.restart()
+        self.assertEqual(self.hg.active_games.used[0], 1000)
+
+    def test_finished_game_moved_to_done(self):
+        self.play(0, 0)
+        while 0 in self.hg.active_games:
+            self.hg.step(0, 0)
+        self.restart()
+        self.assertNotIn(0, self.hg.active_games)
+        done = os.listdir(self.store.done_directory)
+        self.assertEqual(len(done), 1)
+        self.assertTrue(done[0].startswith("0-"))
+
+    def test_truncated_record_ignored(self):
+        self.play(0, 2)
+        self.store.flush()
+        self.store.sync()
+        with open(self.store.path(0), 'ab') as f:
+            f.write(bytes([STEP, 200, 0, 0, 0, 1, 2]))
+        game, tail = recover(self.store.path(0))
+        self.assertEqual(len(game.history), 2)
+        self.assertEqual(tail, 2)
+
+    def test_torn_record_cut_off_before_appending(self):
+        self.play(0, 2)
+        self.store.flush()
+        self.store.sync()
+        size = os.path.getsize(self.store.path(0))
+        with open(self.store.path(0), 'ab') as f:
+            f.write(bytes([STEP, 200, 0, 0, 0, 1, 2]))
+        self.restart()
+        self.assertEqual(os.path.getsize(self.store.path(0)), size)
+        for _ in range(3):
+            self.hg.step(0, 0)
+        history = list(self.hg.active_games[0].history)
+        self.restart()
+        self.assertEqual(self.hg.active_games[0].history, history)
+
+    def reseed(self, path):
+        records = list(read_records(path))
+        with open(path, 'wb') as f:
+            for record_type, payload in [(CREATE, ("owner", 0, "title", 4, 24, None))] + records[1:]:
+                data = pickle.dumps(payload)
+                f.write(HEADER.pack(record_type, len(data)) + data)
+
+    def test_other_shards_journals_left_untouched(self):
+        self.hg.new_game(0, 0, "owner", "title", guild_id=0)
+        self.hg.new_game(1, 0, "owner", "title", guild_id=1 << 22)
+        self.store.flush()
+        self.store.sync()
+        with open(self.store.path(1), 'ab') as f:
+            # Half of a record the other shard's process is still writing
+            f.write(bytes([SNAPSHOT, 200, 0, 0, 0, 1, 2]))
+        size = os.path.getsize(self.store.path(1))
+        self.store.close()
+        self.hg.active_games.clear()
+        self.store = JournalStore(self.dir, snapshot_interval=4)
+        self.hg = HungerGames(self.store, shard_count=2, shard_ids=[0])
+        self.assertEqual(set(self.hg.active_games), {0})
+        self.assertEqual(os.path.getsize(os.path.join(self.dir, "1-{0}.journal".format(1 << 22))), size)
+
+    def test_diverging_replay_rejected(self):
+        self.play(0, 1)
+        self.store.flush()
+        self.store.sync()
+        self.reseed(self.store.path(0))
+        with self.assertRaises(JournalError):
+            recover(self.store.path(0))
+
+    def test_unrecoverable_journal_set_aside(self):
+        self.play(0, 1)
+        self.play(1, 1)
+        self.store.flush()
+        self.store.sync()
+        self.reseed(self.store.path(0))
+        errors = []
+        self.store.close()
+        self.hg.active_games.clear()
+        self.store = JournalStore(self.dir, snapshot_interval=4, on_error=errors.append)
+        self.hg = HungerGames(self.store)
+        self.assertEqual(set(self.hg.active_games), {1})
+        self.assertEqual(len(errors), 1)
+        self.assertFalse(os.path.exists(self.store.path(0)))
+        self.assertEqual(len(os.listdir(self.store.done_directory)), 1)
+
+    def test_damaged_payload_set_aside(self):
+        self.play(0, 1)
+        self.play(1, 1)
+        self.store.flush()
+        self.store.sync()
+        with open(self.store.path(0), 'r+b') as f:
+            data = f.read()
+            # Cut the creation record's pickle short without changing its length
+            f.seek(HEADER.size + HEADER.unpack_from(data)[1] - 2)
+            f.write(b"\x00\x00")
+        with self.assertRaises(JournalError):
+            recover(self.store.path(0))
+        errors = []
+        self.store.close()
+        self.hg.active_games.clear()
+        self.store = JournalStore(self.dir, snapshot_interval=4, on_error=errors.append)
+        self.hg = HungerGames(self.store)
+        self.assertEqual(set(self.hg.active_games), {1})
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import urllib.error
+import urllib.request
+
+import metrics
+from game import Game
+from player import Player
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter_and_gauge_render(self):
+        counter = self.registry.register(metrics.Counter('c_total', "A counter.", ('code',)))
+        gauge = self.registry.register(metrics.Gauge('g', "A gauge."))
+        counter.labels('NO_GAME').inc()
+        counter.labels('NO_GAME').inc(2)
+        counter.labels('say "hi"\n').inc()
+        gauge.set(1.5)
+        self.assertEqual(self.registry.render(), "\n".join([
+            "# HELP c_total A counter.",
+            "# TYPE c_total counter",
+            'c_total{code="NO_GAME"} 3',
+            'c_total{code="say \\"hi\\"\\n"} 1',
+            "# HELP g A gauge.",
+            "# TYPE g gauge",
+            "g 1.5",
+            ""]))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.register(metrics.Histogram('h', "A histogram.", ('type',), (1, 5)))
+        child = histogram.labels('day')
+        for value in (0.5, 1, 3, 10):
+            child.observe(value)
+        lines = self.registry.render().split("\n")
+        self.assertEqual(lines[2:7], [
+            'h_bucket{type="day",le="1"} 2',
+            'h_bucket{type="day",le="5"} 3',
+            'h_bucket{type="day",le="+Inf"} 4',
+            'h_sum{type="day"} 14.5',
+            'h_count{type="day"} 4'])
+
+    def test_function_metrics_read_when_rendered(self):
+        values = {'ttl': 1}
+        self.registry.register(metrics.Counter('e_total', "Evictions.", ('reason',),
+                                               lambda: [((k,), v) for k, v in values.items()]))
+        values['lru'] = 2
+        self.assertIn('e_total{reason="lru"} 2', self.registry.render())
+
+    def test_game_step_recorded(self):
+        before = metrics.rounds.labels('bloodbath').value
+        g = Game("owner", 0, "title", seed=0)
+        for i in range(4):
+            g.add_player(Player(str(i), i // 2 + 1, i % 2 == 0))
+        g.start()
+        g.step()
+        self.assertEqual(metrics.rounds.labels('bloodbath').value, before + 1)
+        self.assertIn('hungrybot_round_seconds_count{round_type="bloodbath"}', metrics.registry.render())
+
+    def test_served_over_http(self):
+        self.registry.register(metrics.Gauge('g', "A gauge.")).set(7)
+        server = metrics.serve(self.registry, 0)
+        try:
+            url = "http://127.0.0.1:{0}".format(server.server_address[1])
+            with urllib.request.urlopen(url + "/metrics") as response:
+                self.assertTrue(response.headers['Content-Type'].startswith("text/plain; version=0.0.4"))
+                self.assertIn("g 7", response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(url + "/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
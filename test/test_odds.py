@@ -0,0 +1,37 @@
+import unittest
+
+import odds
+from game import StaleGameError
+from odds import simulate_games, simulate_odds
+
+roster = [(str(x), x // 2 + 1, x % 2 == 0) for x in range(8)]
+
+
+class TestOdds(unittest.TestCase):
+
+    def test_win_probabilities_sum_to_one(self):
+        results = simulate_odds(roster, 200, workers=1, seed=1, chunk_size=50)
+        self.assertEqual(results['trials'], 200)
+        self.assertAlmostEqual(sum(t['win'] for t in results['tributes'].values()), 1.0)
+        self.assertAlmostEqual(sum(d['win'] for d in results['districts'].values()), 1.0)
+
+    def test_district_survives_as_long_as_its_last_tribute(self):
+        results = simulate_odds(roster, 200, workers=1, seed=3, chunk_size=50)
+        for district, d in results['districts'].items():
+            members = [t['survival'] for t in results['tributes'].values() if t['district'] == district]
+            self.assertGreaterEqual(d['survival'], max(members))
+            self.assertLessEqual(d['survival'], sum(members))
+
+    def test_seed_reproducible_across_workers(self):
+        single = simulate_odds(roster, 200, workers=1, seed=7, chunk_size=50)
+        pooled = simulate_odds(roster, 200, workers=2, seed=7, chunk_size=50)
+        self.assertEqual(single, pooled)
+        self.assertIs(odds.pool(), odds.pool())
+
+    def test_unknown_tables_refused(self):
+        with self.assertRaises(StaleGameError):
+            simulate_games(roster, 1, 0, "not a digest")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from game import Game
+from hungergames import HungerGames
+from paginate import paginate, TITLE_LIMIT, DESCRIPTION_LIMIT, EMBED_LIMIT
+from player import Player
+
+
+def bloodbath(tributes):
+    g = Game("owner", 0, "The Hunger Games", seed=tributes, max_players=tributes)
+    for i in range(tributes):
+        g.add_player(Player("Tribute Number {0} of {1}".format(i, tributes), i // 2 + 1, i % 2 == 0))
+    g.start()
+    return g.step(), g
+
+
+class TestPaginate(unittest.TestCase):
+
+    def check(self, embed, messages):
+        pages = paginate(embed)
+        for page in pages:
+            self.assertLessEqual(len(page['title']), TITLE_LIMIT)
+            self.assertLessEqual(len(page['description']), DESCRIPTION_LIMIT)
+            self.assertLessEqual(len(page['title']) + len(page['description']) + len(page['footer'] or ""),
+                                 EMBED_LIMIT)
+        lines = [line for page in pages for line in page['description'].split("\n") if line.startswith("> ")]
+        self.assertEqual(lines, ["> " + m for m in messages])
+        self.assertTrue(pages[0]['description'].startswith(embed['header']))
+        self.assertEqual(pages[-1]['footer'], embed['footer'])
+        self.assertTrue(all(page['footer'] is None for page in pages[:-1]))
+        return pages
+
+    def test_rosters(self):
+        for tributes, min_pages in ((24, 1), (200, 2), (2000, 10)):
+            summary, g = bloodbath(tributes)
+            messages = g.render_round(g.history[-1][1], summary['actions'])
+            embed = {'title': summary['title'], 'color': summary['color'], 'header': summary['description'],
+                     'messages': messages, 'footer': summary['footer']}
+            pages = self.check(embed, messages)
+            self.assertGreaterEqual(len(pages), min_pages)
+            if len(pages) > 1:
+                self.assertTrue(pages[-1]['title'].endswith("({0}/{0})".format(len(pages))))
+
+    def test_step_output_fits(self):
+        hg = HungerGames()
+        hg.new_game(0, 0, "owner", "title", seed=0)
+        hg.pad_players(0, ["A Tribute With A Long Name {0}".format(i) for i in range(24)])
+        hg.start_game(0, 0, "h$")
+        ret = hg.step(0, 0)
+        pages = self.check(ret, ret['messages'])
+        self.assertEqual(pages[0]['description'], ret['description'])
+        hg.end_game(0, 0)
+
+    def test_oversized_message_truncated(self):
+        embed = {'title': "t" * 300, 'color': 0, 'header': None, 'messages': ["a" * 5000, "b"], 'footer': None}
+        pages = paginate(embed)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0]['description'], "> " + "a" * (DESCRIPTION_LIMIT - 2))
+        self.assertEqual(pages[1]['description'], "> b")
+        self.assertLessEqual(len(pages[0]['title']), TITLE_LIMIT)
+
+    def test_embed_without_messages_passes_through(self):
+        embed = {'title': "Winner", 'color': 1, 'description': "The winner is a!", 'footer': None}
+        self.assertEqual(paginate(embed), [embed])
+
+
+if __name__ == '__main__':
+    unittest.main()
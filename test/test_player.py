@@ -0,0 +1,31 @@
+import unittest
+
+from player import Player
+
+
+class TestPlayer(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(Player("name", 1), '__dict__'))
+
+    def test_male_pronouns(self):
+        self.assertEqual("{0.he_she_cap} hid {0.his_her} bag by {0.himself_herself}.".format(Player("a", 1, True)),
+                         "He hid his bag by himself.")
+
+    def test_female_pronouns(self):
+        self.assertEqual("{0.he_she_cap} hid {0.his_her} bag by {0.himself_herself}.".format(Player("a", 1, False)),
+                         "She hid her bag by herself.")
+
+    def test_sort_order(self):
+        players = [Player("b", 2, True), Player("a", 1, False), Player("b", 1, True), Player("a", 1, True)]
+        self.assertEqual([(p.name, p.district, p.is_male) for p in sorted(players)],
+                         [("a", 1, True), ("b", 1, True), ("a", 1, False), ("b", 2, True)])
+
+    def test_equal_players_hash_equal(self):
+        self.assertEqual(hash(Player("a", 1, True)), hash(Player("a", 1, True)))
+        self.assertEqual(Player("a", 1, True), Player("a", 1, True))
+        self.assertNotEqual(Player("a", 1, True), Player("a", 1, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+from pool import TributePool
+
+
+class TestTributePool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = TributePool(range(10))
+
+    def test_len(self):
+        self.assertEqual(len(self.pool), 10)
+
+    def test_add_existing_returns_false(self):
+        self.assertFalse(self.pool.add(3))
+        self.assertEqual(len(self.pool), 10)
+
+    def test_remove_keeps_positions_consistent(self):
+        self.assertTrue(self.pool.remove(0))
+        self.assertTrue(self.pool.remove(5))
+        self.assertFalse(self.pool.remove(5))
+        self.assertNotIn(5, self.pool)
+        for i, t in enumerate(self.pool.tributes):
+            self.assertEqual(self.pool.positions[t], i)
+
+    def test_pop_random_drains_pool(self):
+        rng = random.Random(0)
+        drawn = [self.pool.pop_random(rng) for _ in range(10)]
+        self.assertEqual(sorted(drawn), list(range(10)))
+        self.assertEqual(len(self.pool), 0)
+
+    def test_copy_is_independent(self):
+        c = self.pool.copy()
+        c.remove(1)
+        self.assertIn(1, self.pool)
+        self.assertEqual(len(self.pool), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from hungergames import HungerGames
+from registry import GameRegistry
+from store import GameStore
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DeletingStore(GameStore):
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, channel_id):
+        self.deleted.append(channel_id)
+
+
+class TestGameRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def hungergames(self, **kwargs):
+        hg = HungerGames(DeletingStore(), **kwargs)
+        hg.active_games.clock = self.clock
+        return hg
+
+    def test_idle_games_evicted_after_ttl(self):
+        hg = self.hungergames(ttl=100)
+        for channel_id in range(3):
+            hg.new_game(channel_id, 0, "owner", "title")
+            self.clock.now += 10
+        self.clock.now = 105
+        hg.status(0)
+        self.clock.now = 115
+        self.assertEqual(hg.sweep(), [1])
+        self.assertEqual(list(hg.active_games), [2, 0])
+        self.assertEqual(hg.store.deleted, [1])
+        self.assertEqual(hg.active_games.evictions, {'ttl': 1, 'lru': 0})
+
+    def test_least_recently_used_evicted_over_cap(self):
+        hg = self.hungergames(max_games=2)
+        for channel_id in range(4):
+            hg.new_game(channel_id, 0, "owner", "title")
+        hg.add_player(0, "a")
+        self.assertEqual(hg.sweep(), [1, 2])
+        self.assertEqual(set(hg.active_games), {0, 3})
+        self.assertEqual(hg.active_games.evictions, {'ttl': 0, 'lru': 2})
+
+    def test_busy_games_are_kept(self):
+        hg = self.hungergames(max_games=2)
+        for channel_id in range(3):
+            hg.new_game(channel_id, 0, "owner", "title")
+        self.assertEqual(hg.sweep(busy={0}), [1])
+        self.assertEqual(list(hg.active_games), [2, 0])
+        self.assertEqual(hg.sweep(busy={0, 2}), [])
+        hg.new_game(3, 0, "owner", "title")
+        self.assertEqual(hg.sweep(), [2])
+
+    def test_busy_games_never_leave_the_registry(self):
+        hg = self.hungergames(ttl=10)
+        hg.new_game(0, 0, "owner", "title")
+        hg.new_game(1, 0, "owner", "title")
+        self.clock.now = 20
+
+        class Busy:
+            def __contains__(busy, channel_id):
+                # Another thread may look the game up at any moment while sweep runs
+                self.assertIn(0, hg.active_games.keys())
+                return channel_id == 0
+
+        self.assertEqual(hg.sweep(busy=Busy()), [1])
+        self.assertEqual(hg.active_games.used[0], 0)
+
+    def test_sweep_without_limits_keeps_everything(self):
+        hg = self.hungergames()
+        hg.new_game(0, 0, "owner", "title")
+        self.clock.now = 1e9
+        self.assertEqual(hg.sweep(), [])
+
+    def test_spilled_games_restored_on_use(self):
+        hg = self.hungergames(ttl=10, spill_dir=self.dir)
+        hg.new_game(0, 0, "owner", "title", seed=1)
+        hg.add_player(0, "-m a")
+        hg.add_player(0, "-f b")
+        self.clock.now = 20
+        self.assertEqual(hg.sweep(), [0])
+        self.assertEqual(hg.store.deleted, [])
+        self.assertEqual(dict(hg.active_games), {})
+        self.assertEqual(GameRegistry(spill_dir=self.dir).spilled, set())
+        hg.active_games.write_spills()
+
+        reopened = GameRegistry(spill_dir=self.dir)
+        self.assertEqual(reopened.spilled, {0})
+
+        self.assertEqual(hg.add_player(0, "-m c")[-len("tribute!"):], "tribute!")
+        self.assertEqual(hg.active_games.restored, 1)
+        self.assertEqual(set(hg.active_games[0].players), {"a", "b", "c"})
+        self.assertEqual(GameRegistry(spill_dir=self.dir).spilled, set())
+
+    def test_game_restored_before_its_spill_is_written(self):
+        hg = self.hungergames(ttl=10, spill_dir=self.dir)
+        hg.new_game(0, 0, "owner", "title")
+        game = hg.active_games[0]
+        self.clock.now = 20
+        self.assertEqual(hg.sweep(), [0])
+        self.assertIn(0, hg.active_games)
+        self.assertIs(hg.active_games[0], game)
+        hg.active_games.write_spills()
+        self.assertEqual(GameRegistry(spill_dir=self.dir).spilled, set())
+
+
+    def test_unreadable_spill_discarded(self):
+        with open(os.path.join(self.dir, "7.pickle"), 'wb') as f:
+            f.write(b"not a game")
+        hg = self.hungergames(spill_dir=self.dir)
+        self.assertEqual(hg.new_game(7, 0, "owner", "title"), True)
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertEqual(hg.active_games.restored, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from scheduler import Scheduler
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.batches = []
+        self.scheduler = Scheduler(self.record, clock=self.clock)
+
+    async def record(self, keys):
+        self.batches.append((self.clock.now, sorted(keys)))
+
+    def advance(self, until):
+        due = []
+        while self.clock.now < until:
+            self.clock.now += 1
+            due.append((self.clock.now, sorted(self.scheduler.pop_due())))
+        return [d for d in due if d[1]]
+
+    def test_keys_repeat_at_their_intervals(self):
+        self.scheduler.schedule('a', 2)
+        self.scheduler.schedule('b', 3)
+        self.assertEqual(self.advance(6), [(2, ['a']), (3, ['b']), (4, ['a']), (6, ['a', 'b'])])
+
+    def test_cancel_and_reschedule(self):
+        self.scheduler.schedule('a', 2)
+        self.scheduler.schedule('b', 2)
+        self.assertTrue(self.scheduler.cancel('b'))
+        self.assertFalse(self.scheduler.cancel('b'))
+        self.scheduler.schedule('a', 5)
+        self.assertEqual(self.advance(10), [(5, ['a']), (10, ['a'])])
+        self.assertNotIn('b', self.scheduler)
+        self.assertEqual(len(self.scheduler), 1)
+
+    def test_late_keys_skip_missed_calls(self):
+        self.scheduler.schedule('a', 2)
+        self.clock.now = 9
+        self.assertEqual(self.scheduler.pop_due(), ['a'])
+        self.assertEqual(self.advance(12), [(11, ['a'])])
+
+    def test_thousands_of_channels_batched(self):
+        for channel_id in range(5000):
+            self.scheduler.schedule(channel_id, 5 + channel_id % 10)
+        batches = self.advance(14)
+        self.assertEqual(len(batches), 10)
+        # Intervals of 5 to 7 seconds come due twice in 14 seconds
+        self.assertEqual(sum(len(keys) for _, keys in batches), 5000 + 500 * 3)
+        self.assertEqual(len(self.scheduler.heap), 5000)
+
+    async def test_run_hands_due_keys_to_callback(self):
+        ticks = []
+
+        async def sleep(seconds):
+            if len(ticks) == 4:
+                raise asyncio.CancelledError
+            ticks.append(seconds)
+            self.clock.now += seconds
+
+        self.scheduler.sleep = sleep
+        self.scheduler.schedule('a', 2)
+        with self.assertRaises(asyncio.CancelledError):
+            await self.scheduler.run()
+        await asyncio.sleep(0)
+        self.assertEqual([keys for _, keys in self.batches], [['a'], ['a']])
+
+
+if __name__ == '__main__':
+    unittest.main()
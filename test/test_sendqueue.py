@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+
+from sendqueue import SendQueue, TokenBucket, MESSAGE_LIMIT
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeTransport:
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    async def send(self, channel_id, content, embed):
+        self.sent.append((self.clock(), channel_id, content, embed))
+        return len(self.sent)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(2.0, 3, 0.0)
+        for _ in range(3):
+            self.assertEqual(bucket.delay(0.0), 0.0)
+            bucket.take()
+        self.assertAlmostEqual(bucket.delay(0.0), 0.5)
+        self.assertEqual(bucket.delay(0.5), 0.0)
+        self.assertEqual(bucket.delay(100.0), 0.0)
+        self.assertEqual(bucket.tokens, 3)
+
+
+class TestSendQueue(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.transport = FakeTransport(self.clock)
+        self.queue = SendQueue(self.transport, clock=self.clock, sleep=self.clock.sleep,
+                               channel_rate=1.0, channel_burst=2, global_rate=3.0, global_burst=3)
+
+    async def test_channel_rate_limited_in_order(self):
+        embeds = [{'n': i} for i in range(6)]
+        for embed in embeds:
+            self.queue.send(0, embed=embed)
+        await self.queue.join()
+        self.assertEqual([e for _, _, _, e in self.transport.sent], embeds)
+        self.assertEqual([t for t, _, _, _ in self.transport.sent], [0.0, 0.0, 1.0, 2.0, 3.0, 4.0])
+
+    async def test_global_rate_shared_by_channels(self):
+        for channel_id in range(6):
+            self.queue.send(channel_id, embed={})
+        await self.queue.join()
+        times = sorted(t for t, _, _, _ in self.transport.sent)
+        self.assertEqual(times[:3], [0.0, 0.0, 0.0])
+        self.assertGreater(times[3], 0.0)
+        self.assertLessEqual(max(times), 1.0 + 1e-9)
+
+    async def test_adjacent_text_coalesced(self):
+        futures = [self.queue.send(0, "added {0}".format(i)) for i in range(5)]
+        futures.append(self.queue.send(0, embed={'title': "status"}))
+        futures.append(self.queue.send(0, "after"))
+        results = await asyncio.gather(*futures)
+        self.assertEqual([(c, e) for _, _, c, e in self.transport.sent],
+                         [("\n".join("added {0}".format(i) for i in range(5)), None),
+                          (None, {'title': "status"}),
+                          ("after", None)])
+        self.assertEqual(results, [1] * 5 + [2, 3])
+        self.assertEqual(self.queue.metrics()['coalesced'], 4)
+
+    async def test_coalesced_messages_stay_within_limit(self):
+        for _ in range(3):
+            self.queue.send(0, "x" * (MESSAGE_LIMIT // 3 + 1))
+        await self.queue.join()
+        self.assertEqual([len(c) for _, _, c, _ in self.transport.sent],
+                         [2 * (MESSAGE_LIMIT // 3 + 1) + 1, MESSAGE_LIMIT // 3 + 1])
+
+    async def test_metrics(self):
+        for i in range(4):
+            self.queue.send(0, embed={'n': i})
+        self.assertEqual(self.queue.metrics()['depth'], 4)
+        await self.queue.join()
+        metrics = self.queue.metrics()
+        self.assertEqual(metrics['depth'], 0)
+        self.assertEqual(metrics['sent'], 4)
+        self.assertEqual(metrics['max_wait'], 2.0)
+        self.assertEqual(metrics['mean_wait'], 0.75)
+
+    async def test_transport_errors_reach_the_sender(self):
+        async def fail(channel_id, content, embed):
+            raise RuntimeError("forbidden")
+        self.transport.send = fail
+        with self.assertRaises(RuntimeError):
+            await self.queue.send(0, "hello")
+        self.assertEqual(self.queue.metrics()['depth'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
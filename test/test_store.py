@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from hungergames import HungerGames, shard_of
+from store import SQLiteStore
+
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "games.db")
+        self.store = SQLiteStore(self.path)
+        self.hg = HungerGames(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.hg.end_game(0, 0)
+        self.hg.end_game(1, 0)
+        shutil.rmtree(self.dir)
+
+    def restart(self):
+        self.store.close()
+        self.hg.active_games.clear()
+        self.store = SQLiteStore(self.path)
+        self.hg = HungerGames(self.store)
+
+    def test_nothing_written_before_flush(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.store.sync()
+        self.assertEqual(SQLiteStore(self.path).load_all(), {})
+        self.hg.flush()
+        self.store.sync()
+        self.assertEqual(list(SQLiteStore(self.path).load_all()), [0])
+
+    def test_changes_only_mark_the_game_unsaved(self):
+        self.hg.new_game(0, 0, "owner", "title", max_players=100)
+        self.hg.pad_players(0, [str(i) for i in range(100)])
+        self.assertEqual(self.store.unsaved(), [0])
+        self.assertEqual(self.store.encoded, {})
+        self.store.encode(0)
+        self.assertEqual(self.store.unsaved(), [])
+        self.hg.active_games[0].title = "changed after encoding"
+        self.store.flush()
+        self.store.sync()
+        restored = SQLiteStore(self.path).load_all()[0]
+        self.assertEqual(restored.title, "title")
+        self.assertEqual(len(restored.players), 100)
+
+    def test_games_restored_after_restart(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.add_player(0, "-m a")
+        self.hg.new_game(1, 0, "owner", "other")
+        self.restart()
+        self.assertEqual(set(self.hg.active_games), {0, 1})
+        self.assertIn("a", self.hg.active_games[0].players)
+        self.assertEqual(self.hg.active_games[1].title, "other")
+
+    def test_idle_time_survives_restart(self):
+        self.hg.active_games.clock = lambda: 1000.0
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.new_game(1, 0, "owner", "title")
+        self.hg.active_games.clock = lambda: 1500.0
+        self.hg.status(0)
+        self.hg.add_player(0, "-m a")
+        self.store.close()
+        self.store = SQLiteStore(self.path)
+        self.hg = HungerGames(self.store, ttl=600)
+        self.assertEqual(self.hg.active_games.used, {1: 1000.0, 0: 1500.0})
+        self.hg.active_games.clock = lambda: 1700.0
+        self.assertEqual(self.hg.sweep(), [1])
+
+    def test_spilled_game_not_loaded_from_the_store(self):
+        spill_dir = os.path.join(self.dir, "spill")
+        self.hg = HungerGames(self.store, ttl=10, spill_dir=spill_dir)
+        self.hg.active_games.clock = lambda: 0.0
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.add_player(0, "-m a")
+        self.hg.flush()
+        self.hg.active_games.clock = lambda: 100.0
+        self.assertEqual(self.hg.sweep(), [0])
+        self.hg.active_games.write_spills()
+        self.store.close()
+        self.store = SQLiteStore(self.path)
+        self.hg = HungerGames(self.store, ttl=10, spill_dir=spill_dir)
+        self.assertEqual(list(self.hg.active_games.keys()), [])
+        self.assertEqual(os.listdir(spill_dir), ["0.pickle"])
+        self.assertIn(0, self.hg.active_games)
+        self.assertIn("a", self.hg.active_games[0].players)
+        self.assertEqual(self.hg.active_games.restored, 1)
+
+    def test_ended_game_deleted(self):
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.flush()
+        self.hg.end_game(0, 0)
+        self.restart()
+        self.assertNotIn(0, self.hg.active_games)
+
+    def test_restored_game_plays_on_identically(self):
+        self.hg.new_game(0, 0, "owner", "title", seed=3)
+        self.hg.pad_players(0, [str(i) for i in range(12)])
+        self.hg.start_game(0, 0, "h$")
+        self.hg.step(0, 0)
+        self.restart()
+        restored = self.hg.active_games[0]
+        expected = self.hg.active_games[0].__class__.replay(restored.record())
+        expected.step()
+        self.assertEqual(restored.run_to_completion(), expected.run_to_completion())
+        self.assertEqual(restored.transcript(), expected.transcript())
+
+    def test_stale_started_games_dropped(self):
+        import eventpacks
+        self.hg.new_game(0, 0, "owner", "title")
+        self.hg.pad_players(0, ["a", "b"])
+        self.hg.start_game(0, 0, "h$")
+        self.hg.new_game(1, 0, "owner", "pending")
+        known = eventpacks.library.known
+        eventpacks.library.known = {}
+        try:
+            self.restart()
+        finally:
+            eventpacks.library.known = known
+        self.assertEqual(set(self.hg.active_games), {1})
+        self.assertEqual(set(SQLiteStore(self.path).load_all()), {1})
+
+    def test_other_shards_games_left_untouched(self):
+        import eventpacks
+        self.hg.new_game(1, 0, "owner", "title", guild_id=1 << 22)
+        self.hg.pad_players(1, ["a", "b"])
+        self.hg.start_game(1, 0, "h$")
+        self.store.close()
+        self.store = SQLiteStore(self.path)
+        known = eventpacks.library.known
+        eventpacks.library.known = {}
+        try:
+            self.assertEqual(HungerGames(self.store, shard_count=2, shard_ids=[0]).active_games, {})
+        finally:
+            eventpacks.library.known = known
+        self.assertEqual(set(self.store.load_all()), {1})
+
+    def test_each_process_restores_only_its_shards(self):
+        guilds = [0, 1 << 22, 2 << 22]
+        self.assertEqual([shard_of(g, 2) for g in guilds], [0, 1, 0])
+        for channel_id, guild_id in enumerate(guilds):
+            self.hg.new_game(channel_id, 0, "owner", "title", guild_id=guild_id)
+        self.hg.flush()
+        self.store.sync()
+        shards = [HungerGames(self.store, shard_count=2, shard_ids=[s]) for s in (0, 1)]
+        self.assertEqual(set(shards[0].active_games), {0, 2})
+        self.assertEqual(set(shards[1].active_games), {1})
+        with self.assertRaises(ValueError):
+            shards[0].new_game(3, 0, "owner", "title", guild_id=guilds[1])
+        self.hg.end_game(2, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from eventpacks import library
+from player import Player
+from templates import Template
+
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.tributes = [Player("Tribute {0}".format(i), i + 1, i % 2 == 0) for i in range(6)]
+
+    def test_compiles_literals_and_slots(self):
+        t = Template("{0} hits {1.him_her}.")
+        self.assertEqual(t.literals, ("", " hits ", "."))
+        self.assertEqual(t.slots, ((0, 'name'), (1, 'him_her')))
+
+    def test_escaped_braces(self):
+        self.assertEqual(Template("{{{0}}}").render(self.tributes), "{Tribute 0}")
+
+    def test_rejects_format_specs(self):
+        with self.assertRaises(ValueError):
+            Template("{0:>10}")
+
+    def test_rejects_nested_fields(self):
+        with self.assertRaises(ValueError):
+            Template("{0.name.upper}")
+
+    def test_matches_str_format_for_every_action(self):
+        for a in library.tables['actions']:
+            self.assertEqual(a.template.render(self.tributes), a.msg.format(*self.tributes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import copy
+import unittest
+
+from events import events
+from validator import validate_pack
+
+action_base = {
+    'day': {
+        'title': "Day {0}",
+        'description': None,
+        'color': "#ffffff",
+        'nonfatal': [{'msg': "{0} rests.", 'tributes': 1}],
+        'fatal': [{'msg': "{0} kills {1}.", 'tributes': 2, 'killer': [0], 'killed': [1]}]
+    }
+}
+
+
+def pack_with(**changes):
+    pack = copy.deepcopy(action_base)
+    pack['day']['fatal'][0].update(changes)
+    return pack
+
+
+class TestValidator(unittest.TestCase):
+
+    def test_builtin_events_are_valid(self):
+        self.assertEqual(validate_pack(events), [])
+
+    def test_extension_pack_is_valid(self):
+        self.assertEqual(validate_pack(action_base, base=False), [])
+
+    def test_base_pack_requires_every_event(self):
+        self.assertEqual(len(validate_pack(action_base)), 3)
+
+    def test_slot_out_of_range(self):
+        errors = validate_pack(pack_with(msg="{0} kills {1} and {3}."), base=False)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("{3}", errors[0])
+
+    def test_unknown_pronoun(self):
+        errors = validate_pack(pack_with(msg="{0} kills {1.them}."), base=False)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("them", errors[0])
+
+    def test_killer_out_of_range(self):
+        self.assertEqual(len(validate_pack(pack_with(killer=[2]), base=False)), 1)
+
+    def test_killed_out_of_range(self):
+        self.assertEqual(len(validate_pack(pack_with(killed=[-1]), base=False)), 1)
+
+    def test_fatal_must_kill(self):
+        self.assertEqual(len(validate_pack(pack_with(killed=None), base=False)), 1)
+
+    def test_weight_must_be_positive(self):
+        self.assertEqual(validate_pack(pack_with(weight=2.5), base=False), [])
+        self.assertEqual(len(validate_pack(pack_with(weight=0), base=False)), 1)
+        self.assertEqual(len(validate_pack(pack_with(weight="rare"), base=False)), 1)
+
+    def test_nonfatal_cannot_kill(self):
+        pack = copy.deepcopy(action_base)
+        pack['day']['nonfatal'][0]['killed'] = [0]
+        self.assertEqual(len(validate_pack(pack, base=False)), 1)
+
+    def test_arena_event_needs_single_tribute_action(self):
+        pack = {'arena': [dict(action_base['day'], nonfatal=[{'msg': "{0} and {1}", 'tributes': 2}])]}
+        self.assertEqual(len(validate_pack(pack, base=False)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
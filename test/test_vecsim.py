@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from game import Game
+from player import Player
+
+try:
+    import numpy as np
+    import vecsim
+except ImportError:
+    np = None
+    vecsim = None
+
+
+@unittest.skipIf(vecsim is None, "NumPy is not installed")
+class TestVecSim(unittest.TestCase):
+
+    tributes = 12
+    games = 3000
+
+    def reference(self):
+        random.seed(0)
+        rounds = []
+        bloodbath_deaths = []
+        for _ in range(self.games):
+            g = Game(None, None, None)
+            for x in range(self.tributes):
+                g.add_player(Player(str(x), x // 2 + 1, x % 2 == 0))
+            g.start()
+            results = g.run_to_completion()
+            rounds.append(results['rounds'])
+            bloodbath_deaths.append(len(results['deaths'][0]))
+        return np.array(rounds), np.array(bloodbath_deaths)
+
+    def assert_means_agree(self, a, b):
+        stderr = np.sqrt(a.var() / len(a) + b.var() / len(b))
+        self.assertLess(abs(a.mean() - b.mean()), 5 * stderr)
+
+    def test_agrees_with_game(self):
+        ref_rounds, ref_bloodbath = self.reference()
+        results = vecsim.simulate_batch(self.tributes, self.games, np.random.default_rng(0))
+        self.assert_means_agree(ref_rounds, results['rounds'])
+        self.assert_means_agree(ref_bloodbath, (results['death_round'] == 1).sum(axis=1))
+
+    def test_every_game_has_one_winner(self):
+        results = vecsim.simulate_batch(self.tributes, 500, np.random.default_rng(1))
+        self.assertTrue((results['winner'] >= 0).all())
+        self.assertTrue(((results['death_round'] == 0).sum(axis=1) == 1).all())
+
+    def test_odds_summary(self):
+        roster = [(str(x), x // 2 + 1, x % 2 == 0) for x in range(self.tributes)]
+        results = vecsim.simulate_odds(roster, 1000, seed=2, batch_size=300)
+        self.assertEqual(results['trials'], 1000)
+        self.assertAlmostEqual(sum(t['win'] for t in results['tributes'].values()), 1.0)
+        for district, d in results['districts'].items():
+            members = [t['survival'] for t in results['tributes'].values() if t['district'] == district]
+            self.assertGreaterEqual(d['survival'], max(members))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+from string import Formatter
+
+from player import PRONOUNS
+from templates import Template
+
+BASE_EVENTS = ('bloodbath', 'day', 'night', 'feast')
+TRIBUTE_FIELDS = frozenset(['name']) | frozenset(PRONOUNS[0])
+
+
+class EventPackError(ValueError):
+    def __init__(self, name, errors):
+        super().__init__("Event pack '{0}' is invalid:\n{1}".format(name, "\n".join(errors)))
+        self.name = name
+        self.errors = errors
+
+
+def validate_pack(pack, base=True):
+    """
+    Checks an event pack for anything that would only fail once a game reached it.
+
+    base - Whether this is the pack every other pack extends, which must define every base event in full.
+    Returns a list of error messages, empty if the pack is valid.
+    """
+    errors = []
+    if type(pack) is not dict:
+        return ["pack must be a JSON object"]
+
+    for key in BASE_EVENTS:
+        if key in pack:
+            __check_event(pack[key], key, base, errors)
+        elif base:
+            errors.append("{0}: missing".format(key))
+
+    arena = pack.get('arena', [])
+    if type(arena) is not list:
+        errors.append("arena: must be a list of events")
+    else:
+        for i, event in enumerate(arena):
+            __check_event(event, "arena[{0}]".format(i), True, errors)
+
+    for key in pack:
+        if key not in BASE_EVENTS and key != 'arena':
+            errors.append("{0}: unknown event".format(key))
+    return errors
+
+
+def __check_event(event, where, complete, errors):
+    if type(event) is not dict:
+        errors.append("{0}: must be an object".format(where))
+        return
+
+    if complete:
+        if type(event.get('title')) is not str:
+            errors.append("{0}: 'title' must be a string".format(where))
+        if event.get('description') is not None and type(event['description']) is not str:
+            errors.append("{0}: 'description' must be a string or null".format(where))
+        if type(event.get('title')) is str and __fields(event['title']) - {'0'}:
+            errors.append("{0}: title may only reference the day as {{0}}".format(where))
+        color = event.get('color')
+        if not (type(color) is int or (type(color) is str and __is_hex_color(color))):
+            errors.append("{0}: 'color' must be an int or '#rrggbb'".format(where))
+
+    for kind in ('nonfatal', 'fatal'):
+        actions = event.get(kind, [] if not complete else None)
+        if type(actions) is not list:
+            errors.append("{0}: '{1}' must be a list of actions".format(where, kind))
+            continue
+        for i, action in enumerate(actions):
+            __check_action(action, "{0}.{1}[{2}]".format(where, kind, i), kind == 'fatal', errors)
+
+    if complete and type(event.get('nonfatal')) is list \
+            and not any(type(a) is dict and a.get('tributes') == 1 for a in event['nonfatal']):
+        errors.append("{0}: needs a nonfatal action for a single tribute".format(where))
+
+
+def __check_action(action, where, fatal, errors):
+    if type(action) is not dict:
+        errors.append("{0}: must be an object".format(where))
+        return
+
+    tributes = action.get('tributes')
+    if type(tributes) is not int or tributes < 1:
+        errors.append("{0}: 'tributes' must be a positive int".format(where))
+        return
+
+    msg = action.get('msg')
+    if type(msg) is not str:
+        errors.append("{0}: 'msg' must be a string".format(where))
+    else:
+        try:
+            template = Template(msg)
+        except ValueError as e:
+            errors.append("{0}: {1}".format(where, e))
+        else:
+            for index, field in template.slots:
+                if index >= tributes:
+                    errors.append("{0}: '{{{1}}}' is out of range for {2} tributes".format(where, index, tributes))
+                if field not in TRIBUTE_FIELDS:
+                    errors.append("{0}: '{1}' is not a tribute field".format(where, field))
+
+    for role in ('killer', 'killed'):
+        indices = action.get(role)
+        if indices is None:
+            if role == 'killed' and fatal:
+                errors.append("{0}: a fatal action must kill someone".format(where))
+            continue
+        if not fatal:
+            errors.append("{0}: a nonfatal action cannot have '{1}'".format(where, role))
+            continue
+        if type(indices) is not list or any(type(i) is not int for i in indices):
+            errors.append("{0}: '{1}' must be a list of ints or null".format(where, role))
+            continue
+        if role == 'killed' and len(indices) == 0:
+            errors.append("{0}: a fatal action must kill someone".format(where))
+        if len(set(indices)) != len(indices):
+            errors.append("{0}: '{1}' lists a tribute twice".format(where, role))
+        for i in indices:
+            if i < 0 or i >= tributes:
+                errors.append("{0}: {1} index {2} is out of range for {3} tributes".format(where, role, i, tributes))
+
+    weight = action.get('weight', 1)
+    if type(weight) not in (int, float) or not weight > 0 or weight == float('inf'):
+        errors.append("{0}: 'weight' must be a positive number".format(where))
+
+    unknown = set(action) - {'msg', 'tributes', 'killer', 'killed', 'weight'}
+    if unknown:
+        errors.append("{0}: unknown fields {1}".format(where, ", ".join(sorted(unknown))))
+
+
+def __fields(text):
+    try:
+        return {field for _, field, _, _ in Formatter().parse(text) if field is not None}
+    except ValueError:
+        return {None}
+
+
+def __is_hex_color(text):
+    digits = text[1:] if text.startswith('#') else text
+    return len(digits) == 6 and all(c in "0123456789abcdefABCDEF" for c in digits)
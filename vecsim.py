@@ -0,0 +1,219 @@
+import numpy as np
+
+from eventpacks import library
+from odds import OddsAccumulator, summarize
+
+
+class EventArrays:
+    """The compiled event tables flattened into NumPy arrays.
+
+    Events are numbered bloodbath, day, night, feast, then each arena event. Bucket
+    arrays hold each bucket's alias table, padded to the largest bucket and indexed by
+    event, tribute count and (for fatal actions) victim count, clamped to the largest
+    counts in any event.
+    """
+
+    def __init__(self, compiled):
+        event_list = [compiled[k] for k in ('bloodbath', 'day', 'night', 'feast')] + compiled['arena']
+        actions = compiled['actions']
+
+        self.arena_count = len(compiled['arena'])
+        self.max_tributes = max(e.max_tributes for e in event_list)
+        self.max_victims = max(e.max_victims for e in event_list)
+
+        self.tributes = np.array([a.tributes for a in actions], dtype=np.int64)
+        self.victims = np.array([a.victims for a in actions], dtype=np.int64)
+        self.killer = np.zeros((len(actions), self.max_tributes), dtype=bool)
+        self.killed = np.zeros((len(actions), self.max_tributes), dtype=bool)
+        for a in actions:
+            self.killer[a.id, list(a.killer)] = True
+            self.killed[a.id, list(a.killed)] = True
+
+        t_range = range(self.max_tributes + 1)
+        v_range = range(self.max_victims + 1)
+        widest = max(len(b) for e in event_list for b in e.nonfatal + tuple(b for row in e.fatal for b in row))
+
+        self.nonfatal = np.zeros((len(event_list), len(t_range), widest), dtype=np.int64)
+        self.nonfatal_alias = np.zeros((len(event_list), len(t_range), widest), dtype=np.int64)
+        self.nonfatal_prob = np.ones((len(event_list), len(t_range), widest))
+        self.nonfatal_len = np.zeros((len(event_list), len(t_range)), dtype=np.int64)
+        self.fatal = np.zeros((len(event_list), len(t_range), len(v_range), widest), dtype=np.int64)
+        self.fatal_alias = np.zeros((len(event_list), len(t_range), len(v_range), widest), dtype=np.int64)
+        self.fatal_prob = np.ones((len(event_list), len(t_range), len(v_range), widest))
+        self.fatal_len = np.zeros((len(event_list), len(t_range), len(v_range)), dtype=np.int64)
+        for i, e in enumerate(event_list):
+            for t in t_range:
+                table = e.nonfatal[min(t, e.max_tributes)]
+                self.nonfatal[i, t, :len(table)] = [a.id for a in table.actions]
+                self.nonfatal_alias[i, t, :len(table)] = [a.id for a in table.alias]
+                self.nonfatal_prob[i, t, :len(table)] = table.prob
+                self.nonfatal_len[i, t] = len(table)
+                for v in v_range:
+                    table = e.fatal[min(t, e.max_tributes)][min(v, e.max_victims)]
+                    self.fatal[i, t, v, :len(table)] = [a.id for a in table.actions]
+                    self.fatal_alias[i, t, v, :len(table)] = [a.id for a in table.alias]
+                    self.fatal_prob[i, t, v, :len(table)] = table.prob
+                    self.fatal_len[i, t, v] = len(table)
+
+
+def simulate_batch(tributes, games, rng, arrays=None):
+    """
+    Plays games independent games of tributes tributes at once, tracking outcomes only.
+
+    Mirrors the round logic of Game.step. Returns the winner index (-1 if none), the number of rounds, the kill
+    counts and the round each tribute died in (0 for the winner) for every game.
+    """
+    if arrays is None:
+        arrays = EventArrays(library.tables)
+    g_all = np.arange(games)
+    slots = np.arange(arrays.max_tributes)
+
+    alive = np.ones((games, tributes), dtype=bool)
+    kills = np.zeros((games, tributes), dtype=np.int64)
+    death_round = np.zeros((games, tributes), dtype=np.int64)
+    total_alive = np.full(games, tributes, dtype=np.int64)
+    rounds = np.zeros(games, dtype=np.int64)
+
+    day = np.ones(games, dtype=np.int64)
+    days_since_last_event = np.zeros(games, dtype=np.int64)
+    rounds_without_deaths = np.zeros(games, dtype=np.int64)
+    bloodbath_passed = np.zeros(games, dtype=bool)
+    day_passed = np.zeros(games, dtype=bool)
+    fallen_passed = np.zeros(games, dtype=bool)
+    night_passed = np.zeros(games, dtype=bool)
+
+    while True:
+        active = total_alive > 1
+        if not active.any():
+            break
+        rounds[active] += 1
+
+        new_day = active & night_passed
+        day[new_day] += 1
+        days_since_last_event[new_day] += 1
+        day_passed[new_day] = False
+        fallen_passed[new_day] = False
+        night_passed[new_day] = False
+
+        feast_chance = 100 * (days_since_last_event ** 2 / 55.0) + (9.0 / 55.0)
+        fatality_factor = rng.integers(2, 5, size=games) + rounds_without_deaths
+
+        rest = active.copy()
+        bloodbath = rest & (day == 1) & ~bloodbath_passed
+        rest &= ~bloodbath
+        feast = rest & ~day_passed & (rng.integers(0, 101, size=games) < feast_chance)
+        rest &= ~feast
+        arena = rest & (days_since_last_event > 0) & (rng.integers(1, 21, size=games) == 1)
+        rest &= ~arena
+        day_round = rest & ~day_passed
+        rest &= ~day_round
+        fallen = rest & ~fallen_passed
+        night = rest & ~fallen
+
+        bloodbath_passed[bloodbath] = True
+        fatality_factor[bloodbath] += 2
+        days_since_last_event[feast | arena] = 0
+        fatality_factor[feast] += 2
+        fatality_factor[arena] += 1
+        day_passed[day_round] = True
+        fallen_passed[fallen] = True
+        night_passed[night] = True
+
+        event = np.zeros(games, dtype=np.int64)
+        event[day_round] = 1
+        event[night] = 2
+        event[feast] = 3
+        event[arena] = 4 + rng.integers(0, arrays.arena_count, size=games)[arena]
+
+        acting = active & ~fallen
+        keys = rng.random((games, tributes))
+        keys[~alive] = 2.0
+        order = np.argsort(keys, axis=1)
+        available = np.where(acting, total_alive, 0)
+        cursor = np.zeros(games, dtype=np.int64)
+        alive_before = total_alive.copy()
+
+        while True:
+            g = g_all[available > 0]
+            if len(g) == 0:
+                break
+            t = np.minimum(available[g], arrays.max_tributes)
+            v = np.clip(total_alive[g] - 1, 0, arrays.max_victims)
+            ev = event[g]
+
+            f = rng.integers(0, 11, size=len(g))
+            fatal_len = arrays.fatal_len[ev, t, v]
+            fatal = (f < fatality_factor[g]) & (total_alive[g] > 1) & (fatal_len > 0)
+            nonfatal_len = arrays.nonfatal_len[ev, t]
+            u = rng.random(len(g)) * np.where(fatal, fatal_len, nonfatal_len)
+            pick = u.astype(np.int64)
+            keep = (u - pick) < np.where(fatal, arrays.fatal_prob[ev, t, v, pick], arrays.nonfatal_prob[ev, t, pick])
+            action = np.where(fatal,
+                              np.where(keep, arrays.fatal[ev, t, v, pick], arrays.fatal_alias[ev, t, v, pick]),
+                              np.where(keep, arrays.nonfatal[ev, t, pick], arrays.nonfatal_alias[ev, t, pick]))
+
+            n = arrays.tributes[action]
+            positions = np.minimum(cursor[g][:, None] + slots, tributes - 1)
+            players = order[g[:, None], positions]
+            in_action = slots < n[:, None]
+
+            rows, cols = np.nonzero(arrays.killer[action] & in_action)
+            kills[g[rows], players[rows, cols]] += arrays.victims[action][rows]
+            rows, cols = np.nonzero(arrays.killed[action] & in_action)
+            alive[g[rows], players[rows, cols]] = False
+            death_round[g[rows], players[rows, cols]] = rounds[g[rows]]
+            total_alive[g] -= arrays.victims[action]
+
+            cursor[g] += n
+            available[g] -= n
+
+        deaths = total_alive < alive_before
+        rounds_without_deaths[acting & ~deaths] += 1
+        rounds_without_deaths[acting & deaths] = 0
+
+    winner = np.where(total_alive == 1, np.argmax(alive, axis=1), -1)
+    return {'winner': winner, 'rounds': rounds, 'kills': kills, 'death_round': death_round}
+
+
+def simulate_odds(roster, trials=100000, seed=None, batch_size=None):
+    """
+    Estimates each tribute's and district's chances like odds.simulate_odds, but plays the games in NumPy batches.
+
+    Games in a batch are played side by side, but each round still assigns its actions one at a time, so the gain
+    shrinks as rosters grow: benchmarks/bench_vecsim.py measures about 12x a single process of odds.simulate_odds at
+    24 tributes and about 7x at 1000.
+
+    roster - A list of (name, district, is_male) tuples.
+    """
+    roster = [tuple(t) for t in roster]
+    if batch_size is None:
+        batch_size = max(1, min(trials, (1 << 20) // len(roster)))
+    rng = np.random.default_rng(seed)
+    arrays = EventArrays(library.tables)
+    acc = OddsAccumulator(roster)
+    districts = {}
+    for i, (_, district, _) in enumerate(roster):
+        districts.setdefault(district, []).append(i)
+
+    remaining = trials
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        results = simulate_batch(len(roster), n, rng, arrays)
+        wins = np.bincount(results['winner'][results['winner'] >= 0], minlength=len(roster))
+        survival = results['death_round'].sum(axis=0)
+        survival += np.bincount(results['winner'][results['winner'] >= 0],
+                                weights=results['rounds'][results['winner'] >= 0],
+                                minlength=len(roster)).astype(np.int64)
+        kills = results['kills'].sum(axis=0)
+        won = results['winner'] >= 0
+        rounds_survived = results['death_round'].copy()
+        rounds_survived[np.nonzero(won)[0], results['winner'][won]] = results['rounds'][won]
+        for district, columns in districts.items():
+            acc.district_survival[district] += int(rounds_survived[:, columns].max(axis=1).sum())
+        acc.trials += n
+        for i, (name, _, _) in enumerate(roster):
+            acc.wins[name] += int(wins[i])
+            acc.kills[name] += int(kills[i])
+            acc.survival[name] += int(survival[i])
+        remaining -= n
+    return summarize(roster, acc)